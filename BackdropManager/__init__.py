@@ -1,7 +1,16 @@
-from BackdropManager import backdrop_manager, info
-
 try:
-    backdrop_manager.nuke_setup()
-except Exception:
-    import traceback
-    traceback.print_exc() 
+    import nuke
+except ImportError:
+    # Outside Nuke, only the pure Python modules (nk, diff, lint, geometry, graph) can be used
+    nuke = None
+
+# The UI only loads in an interactive session. In terminal mode (nuke -t) and on the farm the package
+# stays Qt-free, and BackdropManager.core has the backdrop logic and settings
+if nuke is not None and nuke.GUI:
+    from BackdropManager import backdrop_manager, info
+
+    try:
+        backdrop_manager.nuke_setup()
+    except Exception:
+        import traceback
+        traceback.print_exc() 
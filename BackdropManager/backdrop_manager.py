@@ -2,11 +2,18 @@ import nuke
 from nukescripts import panels
 import os
 from functools import partial
-import traceback
 import colorsys
 import datetime
+import time
+import collections
 
 from BackdropManager.info import __version__, __date__
+from BackdropManager.registry import registry, CLASSES, install as install_registry
+from BackdropManager import core, layout, follow, minimap, search, spec, layout_file, diff, telemetry
+from BackdropManager.core import (interface2rgb, rgb2hex, rgb2interface,
+                                  split_label, make_label, selected_backdrops, snap, create_backdrop,
+                                  QUICK_PRESETS, quick_backdrop, quick_recolor, quick_shortcut,
+                                  Overrides)
 
 try:
     # Prefer Qt.py when available
@@ -29,7 +36,24 @@ nuke.tprint('BackdropManager v{0}, built {1}.\n'
             'Copyright (c) 2022-{2} Samantha Maiolo.'
             ' All Rights Reserved.'.format(__version__, __date__, year))    
         
-icon_path = os.path.expanduser("~/.nuke/BackdropManager/icons/")
+# Icons ship next to this file. A compiled resource bundle is used instead when present, so making a
+# panel reads no files:  pyside2-rcc icons.qrc -o icons_rc.py  (in the BackdropManager folder)
+icon_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "icons", "")
+try:
+    from BackdropManager import icons_rc
+    icon_path = ":/BackdropManager/icons/"
+except ImportError:
+    pass
+
+# Loaded once per session, shared by every panel
+_icons = {}
+
+def get_icon(name):
+    """ Returns the cached QIcon for an icon file name, e.g. "Snap.png". """
+    icon = _icons.get(name)
+    if icon is None:
+        icon = _icons[name] = QtGui.QIcon(icon_path + name)
+    return icon
 
 nuke_ver = nuke.NUKE_VERSION_MAJOR
 
@@ -69,6 +93,10 @@ def get_dag_node(dag_widget):
         return nuke.root()
     return nuke.toNode(title.replace(" " + DAG_TITLE, ""))
     
+def _operation(func):
+    """ Name logged for a command, also for partials of a method. """
+    return getattr(func, '__name__', None) or getattr(func, 'func', func).__name__
+
 def wrapped(func):
     """ Executes the function in the currently active DAG. """
     def wrapper(*args, **kwargs):
@@ -79,36 +107,23 @@ def wrapped(func):
             if node is None:
                 node = nuke.root()
             with node:
+               t0 = time.perf_counter()
                result = func(*args, **kwargs)
+               if telemetry.is_enabled():
+                   depth = 0 if node.Class() == 'Root' else node.fullName().count('.') + 1
+                   telemetry.record(_operation(func), time.perf_counter() - t0, len(nuke.allNodes()), depth, nuke_ver)
                return result
     return wrapper
 
-def interface2rgb(hexValue, normalize = True):
-    """ Convert a color stored as a 32 bit value as used by nuke for interface colors to normalized rgb values. """
-    return [(0xFF & hexValue >>  i) / 255.0 for i in [24,16,8]]
-
-def rgb2hex(rgbaValues):
-    """Convert a color stored as normalized rgb values to a hex. """
-    rgbaValues = [int(i * 255) for i in rgbaValues]
-
-    if len(rgbaValues) < 3:
-        return
-
-    return '#%02x%02x%02x' % (rgbaValues[0],rgbaValues[1],rgbaValues[2])
-
-def hex2rgb(hexColor):
-    """ Convert a color stored as hex to rgb values. """
-    hexColor = hexColor.lstrip('#')
-    return tuple(int(hexColor[i:i+2], 16) for i in (0, 2 ,4))    
-    
-def hex2interface(hexColor):
-    """ Convert a color stored as hex to a 32 bit value as used by nuke for interface colors. """   
-    hexColor = hexColor.lstrip('#')
-    return int(hexColor+'00', 16)    
-
-def rgb2interface(rgb):
-    """ Convert a color stored as rgb values to a 32 bit value as used by nuke for interface colors. """
-    return int('%02x%02x%2x%02x' % (int(rgb[0]*255), int(rgb[1]*255), int(rgb[2]*255),1),16)
+def timed(func):
+    """ Logs the duration of a command that works on the whole script, when telemetry is on. """
+    def wrapper(*args, **kwargs):
+        t0 = time.perf_counter()
+        result = func(*args, **kwargs)
+        if telemetry.is_enabled():
+            telemetry.record(_operation(func), time.perf_counter() - t0, len(nuke.allNodes(recurseGroups=True)), 0, nuke_ver)
+        return result
+    return wrapper
 
 def _widget_with_label(towrap, text):
     """ Wraps the given widget in a layout, with a label to the left """
@@ -122,11 +137,111 @@ def _widget_with_label(towrap, text):
     w.setLayout(layout)
     return w     
     
+# Shared by the widgets whose look follows their state. Set once when a widget is made (setting it on
+# a whole dialog would run every swatch row through the stylesheet style), then changed through dynamic
+# properties so a toggle only repolishes itself instead of parsing a new stylesheet
+STYLE_SHEET = """
+QPushButton[toggle="bold"] { font: bold; }
+QPushButton[toggle="italic"] { font: italic; }
+QPushButton[active="true"] { background-color: #787878; }
+QPushButton[recording="true"] { text-align: left; }
+*[mixed="true"] { color: #e0a040; }
+"""
+
+def repolish(widget):
+    """ Restyles one widget after a property the stylesheet uses changed """
+    style = widget.style()
+    style.unpolish(widget)
+    style.polish(widget)
+    widget.update()
+
+def toggle_button(text, kind):
+    """ Makes a bold or italic toggle button, highlighted while active """
+    btn = QtWidgets.QPushButton(text)
+    btn.setStyleSheet(STYLE_SHEET)
+    btn.setProperty('toggle', kind)
+    btn.setProperty('active', False)
+    btn.setFixedSize(20,20)
+    return btn
+
+def set_active(widget, active):
+    """ Highlights a toggle button or not """
+    if widget.property('active') != active:
+        widget.setProperty('active', active)
+        repolish(widget)
+
+def set_swatch(widget, color):
+    """ Shows an rgb color on a button or dropdown through its palette, None for the default """
+    if color is None:
+        widget.setPalette(QtGui.QPalette())
+        return
+    widget.setAutoFillBackground(True)
+    p = widget.palette()
+    p.setColor(QtGui.QPalette.Button, QtGui.QColor(rgb2hex(color)))
+    widget.setPalette(p)
+
 def setCurrentText(widget, text):
     """ Change setCurrentText to a function to work with Nuke10 """
     index = widget.findText(text, QtCore.Qt.MatchFixedString)
     if index >= 0:
-        widget.setCurrentIndex(index)            
+        widget.setCurrentIndex(index)
+
+# Font list cache, built once per session and shared by every dialog
+_font_model = None
+_font_rows = None
+
+# Nuke's default note_font
+DEFAULT_FONT = 'Verdana'
+
+def font_model():
+    """ Returns the shared font list model, building it on first use. """
+    global _font_model, _font_rows
+    if _font_model is None:
+        try:
+            # Static in PySide6
+            families = QtGui.QFontDatabase.families()
+        except TypeError:
+            families = QtGui.QFontDatabase().families()
+        families = sorted(set(families), key=lambda s: s.lower())
+        _font_rows = dict((name, row) for row, name in enumerate(families))
+        # Parent to the application so the model lives as long as the session
+        _font_model = QtCore.QStringListModel(families, QtWidgets.QApplication.instance())
+    return _font_model
+
+def font_row(name):
+    """ Returns the row of a font in the cached font list, or -1 if it isn't installed.
+    Nuke's note_font values may carry a style suffix ("Verdana Bold"), so fall back to the family. """
+    font_model()
+    if name in _font_rows:
+        return _font_rows[name]
+    words = name.split(" ")
+    while len(words) > 1:
+        words.pop(-1)
+        family = " ".join(words)
+        if family in _font_rows:
+            return _font_rows[family]
+    return -1
+
+def valid_font(name):
+    """ Checks a note_font value against the cached font list. """
+    return bool(name) and font_row(name) >= 0
+
+class FontComboBox(QtWidgets.QComboBox):
+    """ Lightweight replacement for QFontComboBox that shares the cached font model
+    instead of enumerating and previewing every installed font on construction. """
+    def __init__(self, parent=None):
+        QtWidgets.QComboBox.__init__(self, parent)
+        self.setModel(font_model())
+        # Don't measure every item to compute the size hint
+        self.setSizeAdjustPolicy(QtWidgets.QComboBox.AdjustToMinimumContentsLengthWithIcon)
+        self.setMinimumContentsLength(18)
+        self.setMaxVisibleItems(20)
+
+    def setCurrentFont(self, name):
+        """ Selects a font by name using the cached lookup. """
+        row = font_row(name)
+        if row >= 0:
+            self.setCurrentIndex(row)
 
 class DragButton(QtWidgets.QPushButton):
     def set_data(self, data):
@@ -144,50 +259,143 @@ class DragButton(QtWidgets.QPushButton):
 
             drag.exec_(Qt.MoveAction)
 
-def filter(list):
-    """ Filter through selected backdrops for the largest. """
-    backdrop_dict = {}
-    area = []
-    for x in list:
-        if x.Class() == 'BackdropNode':
-            a = int(x['bdwidth'].value() * x['bdheight'].value())
-            backdrop_dict[x] = a
-            area.append(a)
-    area.sort()
-    return(area, backdrop_dict)
-
-def snap():    
-    """ Snap backdrops to the selected nodes. """
-    settings = Overrides()        
-    d = settings.restore()        
-    selNodes = nuke.selectedNodes()
-    padding = d['padding']
-    
-    if len(selNodes) == 0: 
+class _Mixed(object):
+    """ Marks a snapshot field whose value differs between the selected backdrops. """
+    def __repr__(self):
+        return 'MIXED'
+
+MIXED = _Mixed()
+
+def snapshot(nodes):
+    """ Reads the editable knobs of the given backdrops in one pass.
+    Fields whose value differs between the nodes are set to MIXED. """
+    snap = {}
+    for n in nodes:
+        align, bold, italic, text = split_label(n['label'].value())
+        values = {
+            'text': text,
+            'align': align,
+            'bold': bold,
+            'italic': italic,
+            'tile_color': int(n['tile_color'].value()),
+            'note_font': n['note_font'].value(),
+            'note_font_size': int(n['note_font_size'].value()),
+            'bookmark': bool(n['bookmark'].value()),
+            'z_order': int(n['z_order'].value()),
+                  }
+        if nuke_ver >= 12:
+            values['appearance'] = n['appearance'].value()
+            values['border_width'] = int(n['border_width'].value())
+
+        for k, v in values.items():
+            if k not in snap:
+                snap[k] = v
+            elif snap[k] is not MIXED and snap[k] != v:
+                snap[k] = MIXED
+    return snap
+
+def pack():
+    """ Pack the top-level backdrops so they don't overlap, spaced by the padding. """
+    d = Overrides().restore()
+    layout.pack_backdrops(d['padding'])
+
+def auto_wrap():
+    """ Wrap each cluster of nodes that isn't inside a backdrop in a new one, using the default settings. """
+    created = layout.auto_wrap(Overrides().restore())
+    print("Wrapped %d clusters of nodes" % len(created))
+
+def wrap_writes():
+    """ Wrap the upstream tree of each Write in a backdrop labelled from its file. """
+    layout.wrap_write_trees(Overrides().restore())
+
+def wrap_reads():
+    """ Wrap each Read branch, up to the first merge, in a backdrop labelled from its file. """
+    layout.wrap_read_branches(Overrides().restore())
+
+def export_layout(path=None):
+    """ Save the backdrop layout of the whole script to a file. """
+    if path is None:
+        path = nuke.getFilename('Export Backdrop Layout', '*.json')
+        if not path:
+            return
+    count = layout_file.export_layout(path)
+    print("Exported %d backdrops to %s" % (count, path))
+
+def import_layout(path=None):
+    """ Re-apply a saved backdrop layout to the script, in one undo step. """
+    if path is None:
+        path = nuke.getFilename('Import Backdrop Layout', '*.json')
+        if not path:
+            return
+    try:
+        updated, created, skipped = layout_file.import_layout(path, Overrides().restore())
+    except (ValueError, IOError) as e:
+        nuke.message("Could not import backdrop layout:\n%s" % e)
         return
-        
-    else:
-        a = filter(selNodes)[0]
-        b = filter(selNodes)[1]
-        
-        if a == []:          
+    print("Backdrop layout: %d updated, %d created, %d skipped" % (updated, created, skipped))
+
+class LayoutDiffDialog(QtWidgets.QDialog):
+    """ Lists the backdrop changes between a script file and the open script. """
+    def __init__(self, parent=None):
+        QtWidgets.QDialog.__init__(self, parent)
+        self.setWindowTitle("Backdrop Layout Changes")
+        self.resize(600, 400)
+        layout = QtWidgets.QVBoxLayout()
+        self.setLayout(layout)
+        self.summary = QtWidgets.QLabel()
+        layout.addWidget(self.summary)
+        self.changes = QtWidgets.QListWidget()
+        self.changes.setToolTip("Double click to zoom to a backdrop of the open script")
+        self.changes.itemDoubleClicked.connect(self.jump)
+        layout.addWidget(self.changes)
+
+    def setChanges(self, path, changes):
+        self.summary.setText("%d changes from %s to the open script" % (len(changes), os.path.basename(path)))
+        self.changes.clear()
+        for c in changes:
+            item = QtWidgets.QListWidgetItem(diff.format_change(c))
+            if c[2] is not None:
+                item.setData(Qt.UserRole, c[2].name)
+            self.changes.addItem(item)
+
+    def jump(self, item):
+        name = item.data(Qt.UserRole)
+        if name:
+            minimap.zoom_to(name, select=True)
+
+_diff_dialog = None
+
+def compare_layout(path=None):
+    """ List the backdrop changes between a script file and the open script. """
+    global _diff_dialog
+    if path is None:
+        path = nuke.getFilename('Compare Backdrops With Script', '*.nk')
+        if not path:
             return
-            
-        else:
-            #nuke.Undo.begin()
-            largest = [k for k, v in b.items() if v == a[-1]][0]
-            selNodes.remove(largest)
-            this = largest
-            bdX = min([node.xpos() for node in selNodes]) - padding
-            bdY = min([node.ypos() for node in selNodes]) - padding - 60
-            bdW = max([node.xpos() + node.screenWidth() for node in selNodes]) + padding
-            bdH = max([node.ypos() + node.screenHeight() for node in selNodes]) + padding
-            
-            this.knob('bdwidth').setValue(bdW-bdX)
-            this.knob('xpos').setValue(bdX)                
-            this.knob('bdheight').setValue(bdH-bdY)  
-            this.knob('ypos').setValue(bdY)
-            #nuke.Undo.end() 
+    registry.ensure()
+    changes = diff.diff(diff.nk_layout(path), diff.records_layout(registry.records(None, ('BackdropNode',))))
+    for c in changes:
+        print(diff.format_change(c))
+    if _diff_dialog is None:
+        _diff_dialog = LayoutDiffDialog()
+    _diff_dialog.setChanges(path, changes)
+    _diff_dialog.show()
+    _diff_dialog.raise_()
+    return changes
+
+def create_from_spec(path=None):
+    """ Create the backdrops described in a JSON or YAML spec file, in one undo step. """
+    if path is None:
+        path = nuke.getFilename('Backdrop Spec', '*.json *.yaml *.yml')
+        if not path:
+            return
+    try:
+        created = spec.create_from_spec(spec.load_spec(path), Overrides().restore())
+    except (ValueError, ImportError, IOError) as e:
+        nuke.message("Could not create backdrops from spec:\n%s" % e)
+        return
+    print("Created %d backdrops from %s" % (len(created), path))
+    return created
 
 class KeySequenceWidget(QtWidgets.QWidget):
 
@@ -250,6 +458,7 @@ class KeySequenceButton(QtWidgets.QPushButton):
         self._timer = QtCore.QTimer()
         self._timer.setSingleShot(True)
         self._isrecording = False
+        self.setStyleSheet(STYLE_SHEET)
         self.clicked.connect(self.startRecording)
         self._timer.timeout.connect(self.doneRecording)
 
@@ -358,7 +567,8 @@ class KeySequenceButton(QtWidgets.QPushButton):
 
     def startRecording(self):
         self.setDown(True)
-        self.setStyleSheet("text-align: left;")
+        self.setProperty('recording', True)
+        repolish(self)
         self._isrecording = True
         self._recseq = QtGui.QKeySequence()
         self._modifiers = int(QtWidgets.QApplication.keyboardModifiers() & (Qt.SHIFT | Qt.CTRL | Qt.ALT | Qt.META))
@@ -375,133 +585,12 @@ class KeySequenceButton(QtWidgets.QPushButton):
         if not self._isrecording:
             return
         self.setDown(False)
-        self.setStyleSheet("")
+        self.setProperty('recording', False)
+        repolish(self)
         self._isrecording = False
         self.releaseKeyboard()
         self.updateDisplay()
 
-# Settings JSON file
-def _load_yaml(path):
-    def _load_internal():
-        import json
-        if not os.path.isfile(path):
-            print("Settings file %r does not exist" % (path))
-            return
-        f = open(path)
-        overrides = json.load(f)
-        f.close()
-        return overrides
-
-    # Catch any errors, print traceback and continue
-    try:
-        return _load_internal()
-    except Exception:
-        print("Error loading %r" % path)
-        import traceback
-        traceback.print_exc()
-
-        return None
-
-def _save_yaml(obj, path):
-    def _save_internal():
-        import json
-        ndir = os.path.dirname(path)
-        if not os.path.isdir(ndir):
-            try:
-                os.makedirs(ndir)
-            except OSError as e:
-                if e.errno != 17:  # errno 17 is "already exists"
-                    raise
-
-        f = open(path, "w")
-        json.dump(obj, fp=f, sort_keys=True, indent=1, separators=(',', ': '))
-        f.write("\n")
-        f.close()
-
-    # Catch any errors, print traceback and continue
-    try:
-        _save_internal()
-    except Exception:
-        print("Error saving BackdropManager settings")
-        import traceback
-        traceback.print_exc()
-
-class Overrides(object):
-    def __init__(self):
-        self.settings_path = os.path.expanduser("~/.nuke/BackdropManager/backdropmanager_settings.json")
-
-    def save(self):
-        settings = {
-            'settings': self.defaults,
-            'version': 3,
-                    }
-        _save_yaml(obj=settings, path=self.settings_path)
-       
-        nuke_setup()
-
-    def clear(self):
-        # Default
-        self.defaults = {
-            'colors': [(0.26, 0.26, 0.26), (0.32, 0.255, 0.19), (0.32, 0.19, 0.19), (0.32, 0.19, 0.255), (0.255, 0.19, 0.32), (0.19, 0.19, 0.32), (0.19, 0.255, 0.32), (0.19, 0.32, 0.19)],
-            'labels': ["", "", "", "", "", "", "", ""],
-            'shortcut': 'CTRL+B',
-            'snap': 'CTRL+SHIFT+B',
-            'padding': 40,
-            'style': 'Fill',
-            'width': 15,
-            'zorder': 0,
-            'bookmark': 1,
-            'font': 'Source Code Pro Light',
-            'font_size': 40,
-            'bold': False,
-            'italic': False,
-            'align': 'center'
-                        }
-        self.save()
-
-    def restore(self):
-        """Load the settings from disc, and update Nuke
-        """
-        settings = _load_yaml(path=self.settings_path)
-
-        self.defaults = {
-            'colors': [(0.26, 0.26, 0.26), (0.32, 0.255, 0.19), (0.32, 0.19, 0.19), (0.32, 0.19, 0.255), (0.255, 0.19, 0.32), (0.19, 0.19, 0.32), (0.19, 0.255, 0.32), (0.19, 0.32, 0.19)],
-            'labels': ["", "", "", "", "", "", "", ""],
-            'shortcut': 'CTRL+B',
-            'snap': 'CTRL+SHIFT+B',
-            'padding': 40,
-            'style': 'Fill',
-            'width': 15,
-            'zorder': 0,
-            'bookmark': 1,
-            'font': 'Source Code Pro Light',
-            'font_size': 40,
-            'bold': False,
-            'italic': False,
-            'align': 'center'
-                        }
-
-        if settings is None:
-            self.clear()
-            return self.defaults
-
-        elif int(settings['version']) >= 2:
-            self.defaults = settings['settings']
-            return self.defaults
-
-        else:
-            nuke.warning("Wrong version of backdrop manager config, nothing loaded (version %s loaded, version 3 is the latest), path was %r. Please either delete your settings file or re-download the latest BackdropManager." % (
-                int(settings['version']),
-                self.settings_path))
-            return
-
-    def load(self):
-        settings = {
-            'settings': self.defaults,
-            'version': 3,
-                    }
-        return settings
-
 class BackdropManagerSettings(QtWidgets.QDialog):
     closed = QtCore.Signal()
 
@@ -550,6 +639,19 @@ class BackdropManagerSettings(QtWidgets.QDialog):
         self.shortcut_widget.setShortcut(self.ks)
         self.shortcut_widget.keySequenceChanged.connect(self.updateSC)
         box.addWidget(_widget_with_label(self.shortcut_widget, "Shortcut"))
+
+        # Quick-apply hotkeys
+        self.qb = QtWidgets.QLineEdit(d['quick_backdrop'])
+        self.qb.setToolTip("Hotkeys making a backdrop around the selection in color preset 1 to %d, without the dialog. "
+                           "# stands for the preset number, leave empty for none." % QUICK_PRESETS)
+        self.qb.setFixedWidth(120)
+        box.addWidget(_widget_with_label(self.qb, "preset keys"))
+
+        self.qr = QtWidgets.QLineEdit(d['quick_recolor'])
+        self.qr.setToolTip("Hotkeys recoloring the selected backdrops and sticky notes to color preset 1 to %d. "
+                           "# stands for the preset number, leave empty for none." % QUICK_PRESETS)
+        self.qr.setFixedWidth(120)
+        box.addWidget(_widget_with_label(self.qr, "recolor keys"))
         
         box.addStretch(1)        
         
@@ -576,6 +678,18 @@ class BackdropManagerSettings(QtWidgets.QDialog):
         self.psize.setValue(self.p)
         self.psize.valueChanged.connect(self.updateP)
         box7.addWidget(_widget_with_label(self.psize, "padding"))        
+
+        # Live follow
+        self.lf = QtWidgets.QCheckBox("live follow")
+        self.lf.setToolTip("Grow backdrops automatically, with the padding, as the nodes inside them are moved.")
+        self.lf.setChecked(d['live_follow'])
+        box7.addWidget(self.lf)
+
+        # Usage log
+        self.tl = QtWidgets.QCheckBox("log timings")
+        self.tl.setToolTip("Keep a local log of how long each backdrop action takes, in ~/.nuke/BackdropManager/telemetry.jsonl.")
+        self.tl.setChecked(d['telemetry'])
+        box7.addWidget(self.tl)
         
         box7.addStretch(1)        
 
@@ -591,9 +705,9 @@ class BackdropManagerSettings(QtWidgets.QDialog):
         # Font
         self.f = d['font']
 
-        self.font = QtWidgets.QFontComboBox()
+        self.font = FontComboBox()
         self.font.setToolTip("Set default label font.")
-        setCurrentText(self.font, self.f)
+        self.font.setCurrentFont(self.f)
         box2.addWidget(self.font)
 
         # Font size
@@ -610,24 +724,18 @@ class BackdropManagerSettings(QtWidgets.QDialog):
         # Bold button
         self.boldv = d['bold']  
               
-        self.boldb = QtWidgets.QPushButton("B")
-        self.boldb.setStyleSheet("font: bold;")
+        self.boldb = toggle_button("B", 'bold')
         self.boldb.setToolTip("Make label font bold by default.")
-        self.boldb.setFixedSize(20,20)
-        if self.boldv is True:
-            self.boldb.setStyleSheet("font: bold; background-color: #787878;")
+        set_active(self.boldb, self.boldv is True)
         self.boldb.clicked.connect(self.bold)
         box2.addWidget(self.boldb)
         
         # Italic button
         self.italicv = d['italic']
          
-        self.italicb = QtWidgets.QPushButton("I")
-        self.italicb.setStyleSheet("font: italic;")
+        self.italicb = toggle_button("I", 'italic')
         self.italicb.setToolTip("Make label font italic by default.")
-        self.italicb.setFixedSize(20,20)
-        if self.italicv is True:
-            self.italicb.setStyleSheet("font: italic; background-color: #787878;")        
+        set_active(self.italicb, self.italicv is True)
         self.italicb.clicked.connect(self.italic)        
         box2.addWidget(self.italicb)
         
@@ -698,6 +806,16 @@ class BackdropManagerSettings(QtWidgets.QDialog):
         self.bm.stateChanged.connect(self.updateB)
         box5.addWidget(self.bm)
 
+        box5.addSpacing(20)
+
+        # Restyle inside groups
+        self.rg = QtWidgets.QCheckBox("include groups")
+        self.rg.setToolTip("Also restyle backdrops inside groups and gizmos when setting all backdrops to the default style.")
+        self.rg.setChecked(d['recurse_groups'])
+        box5.addWidget(self.rg)
+
+        box5.addStretch(1)
+
         # Box for Z
         box6 = QtWidgets.QHBoxLayout()
         box6.setContentsMargins(23,0,260,0)
@@ -763,10 +881,7 @@ class BackdropManagerSettings(QtWidgets.QDialog):
             btn = DragButton()
             self.boxes.append(btn)
             btn.setToolTip("Click to change color.")
-            btn.setAutoFillBackground(True)
-            p = btn.palette()
-            p.setColor(btn.backgroundRole(), QtGui.QColor(rgb2hex(color)))
-            btn.setPalette(p)
+            set_swatch(btn, color)
             btn.set_data(color)
             btn.setFixedSize(20,20)
             
@@ -792,12 +907,11 @@ class BackdropManagerSettings(QtWidgets.QDialog):
         p = nuke.toNode('preferences')
         pcol = p['UIBackColor'].value()
         pcol = interface2rgb(pcol)
-        pcol = rgb2hex(pcol)        
 
         # Make minus button (TO DO: Add functionality to select box to remove)
         minb = QtWidgets.QPushButton("-")
         minb.setToolTip("Remove last color box.")
-        minb.setStyleSheet("background-color: %s;" % pcol)        
+        set_swatch(minb, pcol)
         minb.setFixedSize(20,20)
         minb.clicked.connect(self.min)
         pmbox.addWidget(minb)
@@ -805,7 +919,7 @@ class BackdropManagerSettings(QtWidgets.QDialog):
         # Make plus button
         addb = QtWidgets.QPushButton("+")
         addb.setToolTip("Add a new color box.")
-        addb.setStyleSheet("background-color: %s;" % pcol)       
+        set_swatch(addb, pcol)
         addb.clicked.connect(self.add) 
         addb.setFixedSize(20,20)        
         pmbox.addWidget(addb)
@@ -865,10 +979,7 @@ class BackdropManagerSettings(QtWidgets.QDialog):
             btn = DragButton()
             self.boxes.append(btn)
             btn.setToolTip("Click to change color.")
-            btn.setAutoFillBackground(True)
-            p = btn.palette()
-            p.setColor(btn.backgroundRole(), QtGui.QColor(rgb2hex(col)))
-            btn.setPalette(p)
+            set_swatch(btn, col)
             btn.set_data(col)
             btn.setFixedSize(20,20)
             
@@ -923,23 +1034,15 @@ class BackdropManagerSettings(QtWidgets.QDialog):
     
     def bold(self):
         """Saves bold"""
-        if self.boldv == False:
-            self.boldb.setStyleSheet("font: bold; background-color: #787878;")
-            self.boldv = True
-        else:
-            self.boldb.setStyleSheet("font: bold; background-color: ;")
-            self.boldv = False
+        self.boldv = not self.boldv
+        set_active(self.boldb, self.boldv)
         d = self.settings.restore()
         d['bold'] = self.boldv  
         
     def italic(self):
         """Saves italic"""
-        if self.italicv == False:
-            self.italicb.setStyleSheet("font: italic; background-color: #787878;")
-            self.italicv = True
-        else:
-            self.italicb.setStyleSheet("font: italic; background-color: ;")
-            self.italicv = False
+        self.italicv = not self.italicv
+        set_active(self.italicb, self.italicv)
         d = self.settings.restore()
         d['italic'] = self.italicv        
                
@@ -958,9 +1061,7 @@ class BackdropManagerSettings(QtWidgets.QDialog):
         col = interface2rgb(col)
        
         self.colors[color_idx] = col
-     
-        col = rgb2hex(col)
-        btn.setStyleSheet("background-color: %s;" % (col))
+        set_swatch(btn, col)
                
     def default(self):
         """Sets settings to default"""   
@@ -986,6 +1087,11 @@ class BackdropManagerSettings(QtWidgets.QDialog):
         s = d['settings']
         s['font'] = self.font.currentText()
         s['align'] = self.format.currentText()
+        s['recurse_groups'] = self.rg.isChecked()
+        s['live_follow'] = self.lf.isChecked()
+        s['telemetry'] = self.tl.isChecked()
+        s['quick_backdrop'] = self.qb.text().strip()
+        s['quick_recolor'] = self.qr.text().strip()
         s['xpos'] = self.pos().x()
         s['ypos'] = self.pos().y()
         
@@ -1031,6 +1137,8 @@ def gui():
 
     # Make a new instance, keeping it in a global variable to avoid multiple instances being opened
     _sew_instance = BackdropManagerSettings()
+    # Connections to its own methods would otherwise keep it alive after closing
+    _sew_instance.setAttribute(Qt.WA_DeleteOnClose)
 
     def when_closed():
         global _sew_instance
@@ -1052,9 +1160,16 @@ class BackdropManagerUI(QtWidgets.QDialog):
     def __init__(self, parent=None):
         QtWidgets.QDialog.__init__(self)
 
-        # Get settings data
-        o = Overrides()
-        self.data = o.restore()
+        # Create or edit, switched without rebuilding widgets
+        self.mode = 'create'
+        self.colors = None
+        self.labels = None
+
+        # Edit mode state: the nodes being edited, their snapshot and the fields changed since
+        self.nodes = []
+        self.snap = {}
+        self.touched = set()
+        self._loading = False
 
         # Window setup
         self.setWindowTitle("Make backdrop")
@@ -1081,35 +1196,9 @@ class BackdropManagerUI(QtWidgets.QDialog):
         box.setSpacing(0)
         set_layout.addLayout(box)    
 
-        # Color dropdown        
+        # Color dropdown (filled from the presets in reset)
         self.colBox = QtWidgets.QComboBox()
         self.colBox.setFixedSize(100,25)
-        self.colors = self.data['colors']
-        
-        try:
-            self.labels = self.data['labels']
-        except:
-            self.labels = []
-            for c in self.colors:
-                self.labels.append("")
-                self.data['labels'] = self.labels
-                o.save()
-        
-        try:
-            baseCol = rgb2hex(self.colors[0])
-        except:
-            baseCol = None
-            
-            self.colBox.setAutoFillBackground(True)
-            p = self.colBox.palette()
-            p.setColor(self.colBox.backgroundRole(), QtGui.QColor(baseCol))
-            self.colBox.setPalette(p)
-            
-        model = self.colBox.model()
-        for color, label in zip(self.colors, self.labels):
-            row = self.colors.index(color)
-            self.colBox.addItem(label)
-            model.setData(model.index(row, 0), QtGui.QColor(rgb2hex(color)), QtCore.Qt.BackgroundRole)
         box.addWidget(_widget_with_label(self.colBox, "color"))
 
         self.colBox.activated.connect(self.changeColor)
@@ -1122,26 +1211,15 @@ class BackdropManagerUI(QtWidgets.QDialog):
         self.box6.setSpacing(10)
         set_layout.addLayout(self.box6)
         
-        # Label toggle (visible in edit mode)
-        self.labelt = QtWidgets.QCheckBox()
-        self.labelt.setChecked(1)
-        self.labelt.setVisible(False)
-        self.labelt.setStyleSheet("background-color: #595959;")        
-        self.labelt.stateChanged.connect(self.enableL)
-        self.box6.addWidget(self.labelt)        
-       
         # Label
         self.label = QtWidgets.QLineEdit()
         self.label.setFixedWidth(200)
-        self.label.setText("")
         self.box6.addWidget(_widget_with_label(self.label, "label"))
         
         # Format
-        fm = self.data['align']
         self.format = QtWidgets.QComboBox()
         self.format.addItem('left')
         self.format.addItem('center')
-        setCurrentText(self.format, fm)
         self.box6.addWidget(_widget_with_label(self.format, "align"))
         
         self.box6.addStretch(1)
@@ -1153,40 +1231,26 @@ class BackdropManagerUI(QtWidgets.QDialog):
         set_layout.addLayout(box2)
        
         # Font
-        f = self.data['font']
-     
-        self.font = QtWidgets.QFontComboBox()
-        setCurrentText(self.font, f)
+        self.font = FontComboBox()
         box2.addWidget(_widget_with_label(self.font, "font"))
        
         # Font size
-        fs = self.data['font_size']
-       
         self.fsize = QtWidgets.QSpinBox(self)
         self.fsize.setFixedSize(80,25)
         self.fsize.setRange(0,999)               
-        self.fsize.setValue(fs)
         box2.addWidget(self.fsize)
         
         # Bold button
-        self.boldv = self.data['bold']
+        self.boldv = False
               
-        self.boldb = QtWidgets.QPushButton("B")
-        self.boldb.setStyleSheet("font: bold;")
-        self.boldb.setFixedSize(20,20)
-        if self.boldv is True:
-            self.boldb.setStyleSheet("font: bold; background-color: #787878;")
+        self.boldb = toggle_button("B", 'bold')
         self.boldb.clicked.connect(self.boldT)
         box2.addWidget(self.boldb)
         
         # Italic button
-        self.italicv = self.data['italic']
+        self.italicv = False
          
-        self.italicb = QtWidgets.QPushButton("I")
-        self.italicb.setStyleSheet("font: italic;")
-        self.italicb.setFixedSize(20,20)
-        if self.italicv is True:
-            self.italicb.setStyleSheet("font: italic; background-color: #787878;")        
+        self.italicb = toggle_button("I", 'italic')
         self.italicb.clicked.connect(self.italicT)        
         box2.addWidget(self.italicb)     
         
@@ -1200,19 +1264,13 @@ class BackdropManagerUI(QtWidgets.QDialog):
             set_layout.addLayout(box3)
            
             # Style dropdown
-            sd = self.data['style']
-                           
             self.style_drop = QtWidgets.QComboBox()
             self.style_drop.addItem('Fill')
             self.style_drop.addItem('Border')
-            setCurrentText(self.style_drop, sd)
             box3.addWidget(_widget_with_label(self.style_drop, "appearance"))
     
             # Width
-            wval = self.data['width']
-                   
             self.w = QtWidgets.QSpinBox()
-            self.w.setValue(wval)
             self.w.setFixedSize(80,25)
             box3.addWidget(_widget_with_label(self.w, "width"))
             
@@ -1225,10 +1283,7 @@ class BackdropManagerUI(QtWidgets.QDialog):
         set_layout.addLayout(box4)
        
         # Checkbox
-        bval = self.data['bookmark']
-               
         self.bm = QtWidgets.QCheckBox("bookmark")
-        self.bm.setChecked(bval)
         box4.addWidget(self.bm)
        
         # Z order box
@@ -1237,40 +1292,127 @@ class BackdropManagerUI(QtWidgets.QDialog):
         self.box5.setSpacing(5)
         set_layout.addLayout(self.box5)
         
-        # Z order toggle (visible in edit mode)
-        self.zt = QtWidgets.QCheckBox()
-        self.zt.setChecked(1)
-        self.zt.setVisible(False)
-        self.zt.setStyleSheet("background-color: #595959;")        
-        self.zt.stateChanged.connect(self.enableZ)
-        self.box5.addWidget(self.zt) 
-       
         # Z order
-        zval = self.data['zorder']
-       
-        # Check if trying to make a backdrop around a backdrop, if so, default to z order below
-        selected_bd = [n for n in nuke.selectedNodes() if n.Class() == 'BackdropNode']
-        # If there are backdropNodes in our list put the new one immediately behind the farthest one
-        if selected_bd:
-            zval = min([node['z_order'].value() for node in selected_bd]) - 1        
-             
         self.zorder = QtWidgets.QSpinBox(self)
         self.zorder.setFixedSize(80,25)
         self.zorder.setRange(-999,999)
-        self.zorder.setValue(zval)
         self.box5.addWidget(_widget_with_label(self.zorder, "Z Order"))
         
         self.box5.addStretch(1)
    
-        # Close panel button
+        # Close panel button, connected once and dispatched on the current mode
         self.buttonBox = QtWidgets.QDialogButtonBox(self)
         self.buttonBox.setStandardButtons(QtWidgets.QDialogButtonBox.Cancel | QtWidgets.QDialogButtonBox.Ok)
         layout.addWidget(self.buttonBox)
-        self.buttonBox.accepted.connect(wrapped(self.makeBackdrop))
+        self.buttonBox.accepted.connect(self.apply)
         self.buttonBox.rejected.connect(self.close)
-       
+
+        # Track user edits, so edit mode only writes what was changed
+        self.label.textEdited.connect(partial(self.touch, 'text'))
+        self.format.activated.connect(partial(self.touch, 'align'))
+        self.boldb.clicked.connect(partial(self.touch, 'bold'))
+        self.italicb.clicked.connect(partial(self.touch, 'italic'))
+        self.colBox.activated.connect(partial(self.touch, 'tile_color'))
+        self.font.activated.connect(partial(self.touch, 'note_font'))
+        self.fsize.valueChanged.connect(partial(self.touch, 'note_font_size'))
+        self.bm.clicked.connect(partial(self.touch, 'bookmark'))
+        self.bm.clicked.connect(partial(self.bm.setTristate, False))
+        self.zorder.valueChanged.connect(partial(self.touch, 'z_order'))
+        if nuke_ver >= 12:
+            self.style_drop.activated.connect(partial(self.touch, 'appearance'))
+            self.w.valueChanged.connect(partial(self.touch, 'border_width'))
+
+        self.reset()
+
+    def reset(self):
+        """Puts the dialog back into create mode with the saved defaults"""
+        self.mode = 'create'
+        self.setWindowTitle("Make backdrop")
+        self.nodes = []
+        self.snap = {}
+        self.touched = set()
+        self._loading = True
+
+        # Clear any mixed value indicators left over from edit mode
+        mixable = [self.label, self.format, self.boldb, self.italicb, self.colBox, self.font, self.fsize, self.bm, self.zorder]
+        if nuke_ver >= 12:
+            mixable += [self.style_drop, self.w]
+        for widget in mixable:
+            self.setMixed(widget, False)
+        for spin in [self.fsize, self.zorder] + ([self.w] if nuke_ver >= 12 else []):
+            spin.setSpecialValueText("")
+        self.label.setPlaceholderText("")
+        self.bm.setTristate(False)
+
+        # Get settings data
+        o = Overrides()
+        self.data = o.restore()
+
+        self.fillColors()
+        self.colBox.setCurrentIndex(0)
+        set_swatch(self.colBox, None)
+
+        self.label.setText("")
+        setCurrentText(self.format, self.data['align'])
+
+        font = self.data['font']
+        if not valid_font(font):
+            # The saved font isn't installed here, fall back to Nuke's default or the interface font
+            font = DEFAULT_FONT if valid_font(DEFAULT_FONT) else QtWidgets.QApplication.font().family()
+        self.font.setCurrentFont(font)
+        self.fsize.setValue(self.data['font_size'])
+
+        self.boldv = not self.data['bold']
+        self.boldT()
+        self.italicv = not self.data['italic']
+        self.italicT()
+
+        if nuke_ver >= 12:
+            setCurrentText(self.style_drop, self.data['style'])
+            self.w.setValue(self.data['width'])
+
+        self.bm.setChecked(self.data['bookmark'])
+
+        self.zorder.setValue(self.defaultZ())
+
+        self._loading = False
         self.label.setFocus()
-         
+
+    def fillColors(self):
+        """Fills the color dropdown from the presets, only rebuilding it when they changed"""
+        colors = self.data['colors']
+        labels = list(self.data.get('labels') or [])
+        labels += [""] * (len(colors) - len(labels))
+
+        if colors == self.colors and labels == self.labels and self.colBox.count() == len(colors):
+            return
+
+        self.colors = colors
+        self.labels = labels
+        self.colBox.clear()
+        model = self.colBox.model()
+        for row, (color, label) in enumerate(zip(colors, labels)):
+            self.colBox.addItem(label, rgb2interface(color))
+            model.setData(model.index(row, 0), QtGui.QColor(rgb2hex(color)), QtCore.Qt.BackgroundRole)
+
+    def defaultZ(self):
+        """Default z order, below any selected backdrop when wrapping backdrops"""
+        zval = self.data['zorder']
+
+        # Check if trying to make a backdrop around a backdrop, if so, default to z order below
+        selected_bd = wrapped(selected_backdrops)()
+        # If there are backdropNodes in our list put the new one immediately behind the farthest one
+        if selected_bd:
+            zval = min([node['z_order'].value() for node in selected_bd]) - 1
+        return zval
+
+    def apply(self):
+        """OK button, makes or edits depending on the mode"""
+        if self.mode == 'edit':
+            self.editBackdrop()
+        else:
+            wrapped(self.makeBackdrop)()
+
     def closeEvent(self, evt):
         self.closed.emit()
        
@@ -1279,289 +1421,257 @@ class BackdropManagerUI(QtWidgets.QDialog):
     def changeColor(self, index):
         """Changes a box color"""
         l = self.colBox.itemText(index)
-        color = self.colors[index]
-        self.colBox.setStyleSheet("background-color: %s;" % rgb2hex(color))
+        color = interface2rgb(self.colBox.itemData(index))
+        set_swatch(self.colBox, color)
         
-        if l != "":
+        # Only preset labels, not the hex name of a backdrop's own color
+        if l != "" and index < len(self.colors):
             self.label.setText(l)
+            # setText doesn't emit textEdited, edit mode has to write the new label too
+            self.touch('text')
         
     def boldT(self):
         """Toggles bold"""
-        if self.boldv == False:
-            self.boldb.setStyleSheet("font: bold; background-color: #787878;")
-            self.boldv = True
-        else:
-            self.boldb.setStyleSheet("font: bold; background-color: ;")
-            self.boldv = False
+        self.boldv = not self.boldv
+        set_active(self.boldb, self.boldv)
         
     def italicT(self):
         """Toggles italic"""
-        if self.italicv == False:
-            self.italicb.setStyleSheet("font: italic; background-color: #787878;")
-            self.italicv = True
-        else:
-            self.italicb.setStyleSheet("font: italic; background-color: ;")
-            self.italicv = False 
+        self.italicv = not self.italicv
+        set_active(self.italicb, self.italicv)
                 
     def makeBackdrop(self):               
         """Makes a new backdrop"""
         self.close()
-        p = self.data['padding']
         txt = self.label.text()
-        f = "<" + (self.format.currentText()) + ">"
-        idx = self.colBox.currentIndex()
-        color = self.colors[idx]
-        color = rgb2interface(color)
-        if self.boldv:
-            b = "<b>"
-        else:
-            b = ""
-        if self.italicv:
-            i = "<i>"
-        else:
-            i = ""
-    
-        selectedNodes = nuke.selectedNodes()
-    
-        # Get grid size
-        gridWidth = nuke.toNode("preferences")['GridWidth'].getValue()
-        gridHeight = nuke.toNode("preferences")['GridWidth'].getValue()
-    
-        # Start a new undo block to group the backdrop creation actions
-        nuke.Undo.begin('Create Backdrop')
-    
+        color = self.colBox.itemData(self.colBox.currentIndex())
+        style = width = None
+        if nuke_ver >= 12:
+            style = self.style_drop.currentText()
+            width = self.w.value()
+        create_backdrop(nuke.selectedNodes(), self.data['padding'],
+                        label=make_label(txt, self.format.currentText(), self.boldv, self.italicv),
+                        color=color, z_order=self.zorder.value(), bookmark=self.bm.isChecked(),
+                        font=self.font.currentText(), font_size=self.fsize.value(),
+                        style=style, width=width)
+
+        
+    def touch(self, field, *args):
+        """Remembers which fields the user changed in edit mode"""
+        if not self._loading:
+            self.touched.add(field)
+
+    def setMixed(self, widget, mixed):
+        """Marks a widget as showing differing values across the selected backdrops"""
+        if widget.styleSheet() != STYLE_SHEET:
+            # Opts in the first time, every mixable widget goes through here when the panel is set up
+            widget.setStyleSheet(STYLE_SHEET)
+        if widget.property('mixed') != mixed:
+            widget.setProperty('mixed', mixed)
+            repolish(widget)
+        widget.setToolTip("Selected backdrops have different values" if mixed else "")
+
+    def editBackdrop(self):   
+        """Edits the snapshotted backdrops, writing only the fields that were changed"""                     
+        self.close()
+        touched = self.touched
+        if not touched or not self.nodes:
+            return
+
+        values = {}
+        if 'tile_color' in touched:
+            values['tile_color'] = self.colBox.itemData(self.colBox.currentIndex())
+        if 'note_font' in touched:
+            values['note_font'] = self.font.currentText()
+        if 'note_font_size' in touched:
+            values['note_font_size'] = self.fsize.value()
+        if 'bookmark' in touched:
+            values['bookmark'] = self.bm.isChecked()
+        if 'z_order' in touched:
+            values['z_order'] = self.zorder.value()
+        if nuke_ver >= 12:
+            if 'appearance' in touched:
+                values['appearance'] = self.style_drop.currentText()
+            if 'border_width' in touched:
+                values['border_width'] = self.w.value()
+        relabel = touched & set(['text', 'align', 'bold', 'italic'])
+
+        nuke.Undo.begin('Edit Backdrops')
         try:
-            if len(selectedNodes) > 0:
-                # Calculate bounds for the backdrop node.
-                bdX = min([node.xpos() for node in selectedNodes])
-                bdY = min([node.ypos() for node in selectedNodes])
-                bdW = max([node.xpos() + node.screenWidth() for node in selectedNodes])
-                bdH = max([node.ypos() + node.screenHeight() for node in selectedNodes])
-    
-                # Get max Screen Width
-                maxScreenW = max([n.screenWidth() for n in selectedNodes])
-    
-                # Adjust Bounds
-                bdX = int(bdX - p)
-                bdY = int(bdY - (p + 60))
-                bdW = int(bdW + p)
-                bdH = int(bdH + p)
-    
-                # Create Backdrop
-                n = nuke.nodes.BackdropNode(xpos=bdX, bdwidth=bdW - bdX, ypos=bdY, bdheight=bdH - bdY, label=f + b + i + txt, z_order=self.zorder.value(), tile_color=color, bookmark=self.bm.isChecked(), note_font=self.font.currentText(), note_font_size=self.fsize.value(), selected=True)
-                if nuke_ver >= 12:     
-                    n['appearance'].setValue(self.style_drop.currentText())
-                    n['border_width'].setValue(self.w.value())            
-    
-            else:
-                n = nuke.createNode('BackdropNode', inpanel=False)
-                n['label'].setValue(f + b + i + txt)
-                n['z_order'].setValue(self.zorder.value())
-                n['tile_color'].setValue(color)
-                n['bookmark'].setValue(self.bm.isChecked())
-                n['note_font'].setValue(self.font.currentText())
-                n['note_font_size'].setValue(self.fsize.value())
-                if nuke_ver >= 12:     
-                    n['appearance'].setValue(self.style_drop.currentText())
-                    n['border_width'].setValue(self.w.value())
-    
-            # Additional knob logic...
-            k = n.knob('label')
-            n.addKnob(k)
-            k = n.knob('z_order')
-            n.addKnob(k)
-            existing_knobs = n.knobs()
-            for knob in existing_knobs:
-                if knob == "User":
-                    user = n.knob(knob)
-                    user.setName("backdrop_settings")
-                    user.setLabel("Backdrop Settings")
-            try:
-                if any('padding' in knob for knob in existing_knobs):
-                    pass
-                else:
-                    padding = nuke.Int_Knob('padding', 'Padding')
-                    n.addKnob(padding)
-                    padding.setValue(p)       
-                if any('snap' in knob for knob in existing_knobs):
-                    pass
-                else: 
-                    button = nuke.PyScript_Knob('snap', 'Snap to selected nodes')
-                    button.setValue("this = nuke.thisNode()\nselNodes = nuke.selectedNodes()\npadding = this.knob('padding').value()\nif len(selNodes)== 0:\n\tpass\nelse:\n\tbdX = min([node.xpos() for node in selNodes]) - padding\n\tbdY = min([node.ypos() for node in selNodes]) - padding - 60\n\tbdW = max([node.xpos() + node.screenWidth() for node in selNodes]) + padding\n\tbdH = max([node.ypos() + node.screenHeight() for node in selNodes]) + padding\n\tthis.knob('xpos').setValue(bdX)\n\tthis.knob('ypos').setValue(bdY)\n\tthis.knob('bdwidth').setValue(bdW-bdX)\n\tthis.knob('bdheight').setValue(bdH-bdY)")
-                    n.addKnob(button)
-            except:
-                pass
-    
+            for n in self.nodes:
+                if relabel:
+                    # Keep the parts of each label that weren't changed
+                    align, bold, italic, text = split_label(n['label'].value())
+                    if 'text' in touched:
+                        text = self.label.text()
+                    if 'align' in touched:
+                        align = self.format.currentText()
+                    if 'bold' in touched:
+                        bold = self.boldv
+                    if 'italic' in touched:
+                        italic = self.italicv
+                    n['label'].setValue(make_label(text, align, bold, italic))
+                for k, v in values.items():
+                    n[k].setValue(v)
         except Exception as e:
-            # In case of any error, cancel the undo block to discard the changes
             nuke.Undo.cancel()
-            print(f"Error creating backdrop: {e}")
-    
+            print(f"Error editing backdrops: {e}")
         else:
-            # End the undo block, confirming the changes
             nuke.Undo.end()
+            registry.refresh_nodes(self.nodes)
+        self.nodes = []
+                            
+    def switch(self, nodes=None):
+        """This is run when the edit button in the panel is pressed. Sets up the widget to edit mode"""
+        if nodes is None:
+            nodes = wrapped(selected_backdrops)()
+        self.nodes = nodes or []
+        if not self.nodes:
+            return
 
-        
-    def enableL(self):
-        """Enables/disables the label button"""
-        if self.labelt.isChecked():
-            self.label.setEnabled(True)
-        else:  
-            self.label.setEnabled(False)
-            
-    def enableZ(self):
-        """Enables/disables the z order button"""
-        if self.zt.isChecked():
-            self.zorder.setEnabled(True)
-        else:  
-            self.zorder.setEnabled(False)
-        
-    def editBackdrop(self):   
-        """Edits selected backdrops"""                     
-        self.close()
-        txt = self.label.text()
-        z = self.zorder.value()
-        f = "<" + self.format.currentText() + ">"
-        color = self.colBox.currentText()
-        color = hex2interface(color)
+        snap = snapshot(self.nodes)
+        self.snap = snap
 
-        if self.boldv == True:
-            b = "<b>"
+        self.mode = 'edit'
+        if len(self.nodes) > 1:
+            self.setWindowTitle("Edit %d backdrops" % len(self.nodes))
         else:
-            b = ""
-        if self.italicv == True:
-            i = "<i>"
+            self.setWindowTitle("Edit backdrop")
+
+        self._loading = True
+
+        # Label
+        mixed = snap['text'] is MIXED
+        self.label.setText("" if mixed else snap['text'])
+        self.label.setPlaceholderText("mixed" if mixed else "")
+        self.setMixed(self.label, mixed)
+
+        mixed = snap['align'] is MIXED
+        if mixed:
+            self.format.setCurrentIndex(-1)
         else:
-            i = ""
-            
-        active_dag = get_current_dag()
-        dag_node = None
-        if active_dag:
-            node = get_dag_node(active_dag)
-            with node:            
-                for n in nuke.selectedNodes():
-                    if self.labelt.isChecked():
-                        n['label'].setValue(f + b + i + txt)
-                    if self.zt.isChecked():
-                        n['z_order'].setValue(z)
-                    n['tile_color'].setValue(color)
-                    n['bookmark'].setValue(self.bm.isChecked())
-                    n['note_font'].setValue(self.font.currentText())
-                    n['note_font_size'].setValue(self.fsize.value()) 
-                    if nuke_ver >= 12:
-                       n['appearance'].setValue(self.style_drop.currentText())
-                       n['border_width'].setValue(self.w.value())
-                            
-    def switch(self):
-        """This is run when the edit button in the panel is pressed. Sets up the widget to edit mode"""
-        
-        active_dag = get_current_dag()
-        dag_node = None
-        if active_dag:
-            node = get_dag_node(active_dag)
-            with node:
-                sel = nuke.selectedNodes()
-                for n in sel:
-                    n.setSelected(False)
-                    if n.Class() == 'BackdropNode':
-                        n.setSelected(True)
-                        
-                    sel_l = len(sel)   
-                    
-                    if sel_l == 1:
-                        n = nuke.selectedNode()
-                        lbl = n['label'].value()
-                        col = n['tile_color'].value()
-                   
-                self.setWindowTitle("Edit backdrop")
-                self.buttonBox.accepted.disconnect()
-                self.buttonBox.accepted.connect(self.editBackdrop)
-                
-                if sel_l > 1:                
-                    self.labelt.setVisible(True)
-                    self.box6.setContentsMargins(16,0,0,0)  
-                    self.zt.setVisible(True)
-                    self.box5.setContentsMargins(0,0,0,0)  
-                    
-                elif sel_l == 1:
-                    if "<center>" in lbl:
-                        setCurrentText(self.format, "center")
-                    else:
-                        setCurrentText(self.format, "left")
-                        
-                    if "<b>" in lbl:
-                        self.boldv = True
-                        self.boldb.setStyleSheet("font: bold; background-color: #787878;")
-                    else:
-                        self.boldv = False
-                        self.boldb.setStyleSheet("font: bold; background-color: ;")
-                        
-                    if "<i>" in lbl:
-                        self.italicv = True
-                        self.italicb.setStyleSheet("font: italic; background-color: #787878;")
-                    else:
-                        self.italicv = False
-                        self.italicb.setStyleSheet("font: italic; background-color: ;")                
-                        
-                    col = interface2rgb(col)
-                    col = rgb2hex(col)
-        
-                    lbl = lbl.split(">")[-1]
-                    
-                    if self.colBox.findText(col) == -1:
-                        self.colBox.addItem(col)
-                        model = self.colBox.model()
-                        row = len(self.data['colors'])
-                        model.setData(model.index(row, 0), QtGui.QColor(col), QtCore.Qt.BackgroundRole)
-                        
-                    setCurrentText(self.colBox, col)
-                    self.colBox.setStyleSheet("background-color: %s;" % col)
-                    self.label.setText(lbl)
-                    self.zorder.setValue(n['z_order'].value())
-                    setCurrentText(self.style_drop, n['appearance'].value())
-                    self.w.setValue(n['border_width'].value())
-                    self.bm.setChecked(n['bookmark'].value())
-                    setCurrentText(self.font, n['note_font'].value())
-                    self.fsize.setValue(n['note_font_size'].value())
-                else:
-                    self.zorder.setValue(self.data['zorder'])
+            setCurrentText(self.format, snap['align'])
+        self.setMixed(self.format, mixed)
+
+        self.boldv = snap['bold'] is not True
+        self.boldT()
+        self.setMixed(self.boldb, snap['bold'] is MIXED)
+        self.italicv = snap['italic'] is not True
+        self.italicT()
+        self.setMixed(self.italicb, snap['italic'] is MIXED)
+
+        # Color, added as an extra entry when it isn't one of the presets
+        col = snap['tile_color']
+        if col is MIXED:
+            self.colBox.setCurrentIndex(-1)
+            self.setMixed(self.colBox, True)
+        else:
+            # Compare rgb only, Nuke's color picker and the presets store different alpha
+            row = -1
+            for r in range(self.colBox.count()):
+                if (self.colBox.itemData(r) or 0) >> 8 == col >> 8:
+                    row = r
+                    break
+            if row == -1:
+                hexCol = rgb2hex(interface2rgb(col))
+                self.colBox.addItem(hexCol, col)
+                row = self.colBox.count() - 1
+                model = self.colBox.model()
+                model.setData(model.index(row, 0), QtGui.QColor(hexCol), QtCore.Qt.BackgroundRole)
+            self.colBox.setCurrentIndex(row)
+            set_swatch(self.colBox, interface2rgb(col))
+
+        # Font
+        mixed = snap['note_font'] is MIXED
+        if mixed:
+            self.font.setCurrentIndex(-1)
+        else:
+            self.font.setCurrentFont(snap['note_font'])
+        self.setMixed(self.font, mixed)
+
+        spins = [(self.fsize, 'note_font_size'), (self.zorder, 'z_order')]
+        if nuke_ver >= 12:
+            spins.append((self.w, 'border_width'))
+            mixed = snap['appearance'] is MIXED
+            if mixed:
+                self.style_drop.setCurrentIndex(-1)
+            else:
+                setCurrentText(self.style_drop, snap['appearance'])
+            self.setMixed(self.style_drop, mixed)
+
+        for spin, k in spins:
+            mixed = snap[k] is MIXED
+            if mixed:
+                # Shown while the value sits at the minimum
+                spin.setSpecialValueText("mixed")
+                spin.setValue(spin.minimum())
+            else:
+                spin.setValue(snap[k])
+            self.setMixed(spin, mixed)
+
+        if snap['bookmark'] is MIXED:
+            self.bm.setTristate(True)
+            self.bm.setCheckState(Qt.PartiallyChecked)
+            self.setMixed(self.bm, True)
+        else:
+            self.bm.setChecked(snap['bookmark'])
+
+        self._loading = False
+        self.touched = set()
         
+
+# One backdrop dialog per session, shared by create and edit mode
 _sew_instanceUI = None
-   
-def guiUI():
 
-    load_settings()
-   
-    global _sew_instanceUI
+# Time-to-interactive of the backdrop dialog, in milliseconds
+_open_times = collections.deque(maxlen=200)
 
-    if _sew_instanceUI is not None:
-        # Already an instance (make it really obvious - focused, in front and under cursor, like other Nuke GUI windows)
-        _sew_instanceUI.show()
-        _sew_instanceUI.activateWindow()
-        _sew_instanceUI.raise_()
-        return
-   
-    # Make a new instance, keeping it in a global variable to avoid multiple instances being opened
-    _sew_instanceUI = BackdropManagerUI()
+def _ui_instance():
+    """ Returns the shared backdrop dialog, building it on first use. """
+    global _sew_instanceUI
+    if _sew_instanceUI is None:
+        _sew_instanceUI = BackdropManagerUI()
+    return _sew_instanceUI
+
+def _opened(t0, mode):
+    """ Records the time from the shortcut to the first event loop pass after showing the dialog. """
+    ms = (time.perf_counter() - t0) * 1000.0
+    _open_times.append(ms)
+    telemetry.record('open_' + mode, ms / 1000.0, version=nuke_ver)
+    if os.environ.get('BACKDROPMANAGER_TIMING'):
+        print("BackdropManager: %s dialog interactive in %.1f ms" % (mode, ms))
+
+def open_timings():
+    """ Returns (count, median, max) of the recorded dialog open times in milliseconds. """
+    times = sorted(_open_times)
+    if not times:
+        return (0, None, None)
+    return (len(times), times[len(times) // 2], times[-1])
+
+def _show(dialog, t0):
+    # Make it really obvious - focused, in front and under cursor, like other Nuke GUI windows
+    dialog.show()
+    dialog.activateWindow()
+    dialog.raise_()
+    QtCore.QTimer.singleShot(0, partial(_opened, t0, dialog.mode))
 
-    def when_closedUI():
-        global _sew_instanceUI
-        _sew_instanceUI = None
+def guiUI():
+    t0 = time.perf_counter()
+    dialog = _ui_instance()
 
-    _sew_instanceUI.closed.connect(when_closedUI)
+    if dialog.isVisible() and dialog.mode == 'create':
+        # Already open
+        dialog.activateWindow()
+        dialog.raise_()
+        return
 
-    modal = False
-    if modal:
-        _sew_instanceUI.exec_()
-    else:
-        _sew_instanceUI.show()
+    dialog.reset()
+    _show(dialog, t0)
         
 class BackdropPanel(QtWidgets.QDialog):
     def __init__(self):
         QtWidgets.QDialog.__init__(self) 
         
-        self.b = BackdropManagerUI(self)
-        
         self.setAcceptDrops(True)
         
         # Load settings from disc, and into Nuke
@@ -1582,53 +1692,105 @@ class BackdropPanel(QtWidgets.QDialog):
         
         # Buttons        
         btn = QtWidgets.QPushButton()
-        btn.setIcon(QtGui.QIcon(icon_path + "Backdrop.png"))
+        btn.setIcon(get_icon("Backdrop.png"))
         btn.setToolTip("Make backdrop")                  
         btn.setFixedSize(40,25)       
         btn.clicked.connect(guiUI)
         gbox.addWidget(btn)
         
         btn = QtWidgets.QPushButton()
-        btn.setIcon(QtGui.QIcon(icon_path + "Edit.png"))
+        btn.setIcon(get_icon("Edit.png"))
         btn.setToolTip("Edit selected backdrops")                          
         btn.setFixedSize(40,25)
         btn.clicked.connect(guiEdit)
         gbox.addWidget(btn) 
         
         btn = QtWidgets.QPushButton()
-        btn.setIcon(QtGui.QIcon(icon_path + "Toggle.png"))
+        btn.setIcon(get_icon("Toggle.png"))
         btn.setToolTip("Toggle fill/border mode on selected backdrops")
         btn.setFixedSize(40,25)        
         btn.clicked.connect(wrapped(self.toggle))
         gbox.addWidget(btn)        
         
         btn = QtWidgets.QPushButton()
-        btn.setIcon(QtGui.QIcon(icon_path + "Selected.png"))
+        btn.setIcon(get_icon("Selected.png"))
         btn.setToolTip("Set selected backdrops to default style")
         btn.setFixedSize(40,25)        
         btn.clicked.connect(wrapped(self.setStyleSel))
         gbox.addWidget(btn)
         
         btn = QtWidgets.QPushButton()
-        btn.setIcon(QtGui.QIcon(icon_path + "All.png"))
+        btn.setIcon(get_icon("All.png"))
         btn.setToolTip("Set all backdrops to default style")
         btn.setFixedSize(40,25)
         btn.clicked.connect(wrapped(self.setStyle))
         gbox.addWidget(btn)    
         
         btn = QtWidgets.QPushButton()
-        btn.setIcon(QtGui.QIcon(icon_path + "Snap.png"))
+        btn.setIcon(get_icon("Snap.png"))
         btn.setToolTip("Snap backdrop size")
         btn.setFixedSize(40,25)
         btn.clicked.connect(wrapped(snap))
         gbox.addWidget(btn)                    
         
         btn = QtWidgets.QPushButton()
-        btn.setIcon(QtGui.QIcon(icon_path + "Settings.png"))
+        btn.setIcon(get_icon("Settings.png"))
         btn.setToolTip("Open settings")
         btn.setFixedSize(40,25)
         btn.clicked.connect(gui)
         gbox.addWidget(btn)            
+
+        # Backdrop navigator
+        self.search = QtWidgets.QLineEdit()
+        self.search.setPlaceholderText("Find backdrop...")
+        self.search.setToolTip("Fuzzy search backdrop labels, including inside groups. Enter jumps to the first hit.")
+        self.search.textChanged.connect(self.filterBackdrops)
+        self.search.returnPressed.connect(self.jump)
+        sbox = QtWidgets.QHBoxLayout()
+        sbox.setContentsMargins(30,5,30,0)
+        sbox.addWidget(self.search)
+        self.layout.addLayout(sbox)
+
+        self.hits = QtWidgets.QListWidget()
+        self.hits.setVisible(False)
+        self.hits.itemActivated.connect(self.jump)
+        self.layout.addWidget(self.hits)
+
+        # Audit box
+        abox = QtWidgets.QHBoxLayout()
+        abox.setContentsMargins(30,5,30,0)
+        abox.setSpacing(5)
+        self.layout.addLayout(abox)
+
+        btn = QtWidgets.QPushButton("Audit")
+        btn.setToolTip("List partially overlapping backdrops and nodes straddling backdrop edges")
+        btn.setFixedSize(60,20)
+        btn.clicked.connect(wrapped(self.audit))
+        abox.addWidget(btn)
+
+        self.growb = QtWidgets.QPushButton("Grow")
+        self.growb.setToolTip("Grow backdrops around the listed problems (selected ones, or all)")
+        self.growb.setFixedSize(60,20)
+        self.growb.clicked.connect(wrapped(partial(self.resolve, 'grow')))
+        abox.addWidget(self.growb)
+
+        self.shrinkb = QtWidgets.QPushButton("Shrink")
+        self.shrinkb.setToolTip("Refit backdrops to the nodes inside them (selected problems, or all)")
+        self.shrinkb.setFixedSize(60,20)
+        self.shrinkb.clicked.connect(wrapped(partial(self.resolve, 'shrink')))
+        abox.addWidget(self.shrinkb)
+
+        abox.addStretch(1)
+
+        # Audit results, hidden until there are some
+        self.issues = []
+        self.auditList = QtWidgets.QListWidget()
+        self.auditList.setSelectionMode(QtWidgets.QAbstractItemView.ExtendedSelection)
+        self.auditList.setVisible(False)
+        self.auditList.itemSelectionChanged.connect(wrapped(self.selectIssues))
+        self.layout.addWidget(self.auditList)
+        self.growb.setEnabled(False)
+        self.shrinkb.setEnabled(False)
         
         # Make color boxes
         self.makeBoxes()   
@@ -1674,59 +1836,13 @@ class BackdropPanel(QtWidgets.QDialog):
     def setStyleSel(self):
         """Set the selected backdrops to settings style"""
         self.d = self.settings.restore()
-        
-        f = "<" + self.d['align'] + ">"
-        
-        if self.d['bold'] == True:
-            b = "<b>"
-        else:
-            b = ""
-        if self.d['italic'] == True:
-            i = "<i>"
-        else:
-            i = ""
-        
-        for n in nuke.selectedNodes():
-            n.setSelected(False)
-            if n.Class() == 'BackdropNode':
-               n.setSelected(True)
-               
-        for n in nuke.selectedNodes():
-            lbl = n['label'].value()
-            lbl = lbl.split(">")[-1]
-            n.knob('label').setValue(f + b + i + lbl)
-            n.knob('note_font').setValue(self.d['font'])
-            n.knob('note_font_size').setValue(self.d['font_size'])
-            n.knob('appearance').setValue(self.d['style'])
-            n.knob('border_width').setValue(self.d['width'])
-            n.knob('bookmark').setValue(self.d['bookmark'])
+        core.restyle(selected_backdrops(), self.d)
             
     def setStyle(self):
-        """Sets all backdrops to settings style"""
+        """Sets all backdrops to settings style, optionally inside every group as well"""
         self.d = self.settings.restore()
-        
-        f = "<" + self.d['align'] + ">"
-        
-        if self.d['bold'] == True:
-            b = "<b>"
-        else:
-            b = ""
-        if self.d['italic'] == True:
-            i = "<i>"
-        else:
-            i = ""
-        
-        for n in nuke.allNodes():
-            if n.Class() == 'BackdropNode':
-                lbl = n['label'].value()
-                lbl = lbl.split(">")[-1]
-                n.knob('label').setValue(f + b + i + lbl)          
-                n.knob('note_font').setValue(self.d['font'])
-                n.knob('note_font_size').setValue(self.d['font_size'])
-                n.knob('appearance').setValue(self.d['style'])
-                n.knob('border_width').setValue(self.d['width'])
-                n.knob('bookmark').setValue(self.d['bookmark'])        
-                
+        return core.restyle_all(self.d)
+
     def makeBoxes(self):
         # Box group
         self.box_group = QtWidgets.QGroupBox()
@@ -1748,7 +1864,7 @@ class BackdropPanel(QtWidgets.QDialog):
         for idx, color in enumerate(self.colors):
             btn = DragButton()
             btn.setToolTip("Recolor selected backdrops and sticky notes")            
-            btn.setStyleSheet("background-color: %s;" % rgb2hex(color))            
+            set_swatch(btn, color)
             btn.set_data(color)
             btn.setFixedSize(20,20)
             self.box_layout.addWidget(btn)
@@ -1806,7 +1922,7 @@ class BackdropPanel(QtWidgets.QDialog):
             btn.setToolTip("Recolor selected backdrops and sticky notes")                       
             btn.set_data(col)
             btn.setFixedSize(20,20)
-            btn.setStyleSheet("background-color: %s;" % rgb2hex(col))
+            set_swatch(btn, col)
     
             self.box_layout.addWidget(btn)
 
@@ -1815,76 +1931,108 @@ class BackdropPanel(QtWidgets.QDialog):
     def clear(self):
         # Delete box group widget and remake
         self.box_group.deleteLater()
+        # Deleting a layout leaves its buttons behind
+        while self.box.count():
+            w = self.box.takeAt(0).widget()
+            if w is not None:
+                w.deleteLater()
         self.box.deleteLater()
         self.makeBoxes()
             
     def setColor(self, color_idx):
-        # Get Selected Nodes
-        color = self.colors[color_idx]
-        color = int('%02x%02x%2x%02x' % (int(color[0]*255), int(color[1]*255), int(color[2]*255),1),16)
-
-        for n in nuke.selectedNodes():
-            n.setSelected(False)
-            if n.Class() == 'StickyNote' or n.Class() == 'BackdropNode':
-               n.setSelected(True)
-               
-        for n in nuke.selectedNodes():
-            n.knob('tile_color').setValue(color)     
+        core.recolor(selected_backdrops(CLASSES), rgb2interface(self.colors[color_idx]))
             
     def toggle(self):    
         """Toggles backdrops between border and fill"""  
+        core.toggle_appearance(selected_backdrops())
+                
+    def filterBackdrops(self, text):
+        """Lists the backdrops matching the search text"""
+        self.hits.clear()
+        results = search.index.search(text)
+        for name, label in results:
+            item = QtWidgets.QListWidgetItem(label or name)
+            item.setData(Qt.UserRole, name)
+            if '.' in name:
+                # Show where it lives when it's inside a group
+                item.setText("%s  (%s)" % (label or name, name.rpartition('.')[0]))
+            self.hits.addItem(item)
+        self.hits.setVisible(bool(text.strip()))
+        if results:
+            self.hits.setCurrentRow(0)
+
+    def jump(self, *args):
+        """Jumps the DAG to the current search hit and selects its contents"""
+        item = self.hits.currentItem()
+        if item is None:
+            return
+        minimap.zoom_to(item.data(Qt.UserRole), select=True)
+
+    def audit(self):
+        """Lists overlap problems in the current DAG"""
+        self.issues = layout.audit()
+        self.auditList.clear()
+        for kind, bd, other in self.issues:
+            if kind == 'overlap':
+                text = "%s overlaps %s" % (bd.name(), other.name())
+            else:
+                text = "%s straddles the edge of %s" % (other.name(), bd.name())
+            self.auditList.addItem(text)
+        if not self.issues:
+            self.auditList.addItem("No overlaps found")
+        self.auditList.setVisible(True)
+        self.growb.setEnabled(bool(self.issues))
+        self.shrinkb.setEnabled(bool(self.issues))
+
+    def selectedIssues(self):
+        rows = sorted(self.auditList.row(item) for item in self.auditList.selectedItems())
+        return [self.issues[r] for r in rows if r < len(self.issues)]
+
+    def selectIssues(self):
+        """Selects the nodes of the chosen problems and centers the DAG on the last one"""
+        issues = self.selectedIssues()
+        if not issues:
+            return
         for n in nuke.selectedNodes():
             n.setSelected(False)
-            if n.Class() == 'BackdropNode':
-               n.setSelected(True)
+        try:
+            for kind, bd, other in issues:
+                bd.setSelected(True)
+                other.setSelected(True)
+            x1, y1, x2, y2 = layout.backdrop_bounds(issues[-1][1])
+            nuke.zoom(nuke.zoom(), [(x1 + x2) * 0.5, (y1 + y2) * 0.5])
+        except ValueError:
+            # Deleted since the audit
+            self.audit()
+
+    def resolve(self, mode, *args):
+        """Grows or shrinks the offending backdrops, then audits again"""
+        issues = self.selectedIssues() or self.issues
+        if not issues:
+            return
+        d = self.settings.restore()
+        layout.resolve(issues, mode, d['padding'])
+        self.audit()
 
-        for n in nuke.selectedNodes():
-            if n['appearance'].value() == 'Fill':
-                n.knob('appearance').setValue('Border')
-            else:
-                n.knob('appearance').setValue('Fill')  
-                
     def updateValue(self):
         ## Nuke "updateValue" fix        
         pass                  
 
-_sew_instanceEdit = None   
-           
 def guiEdit():
-
-    load_settings()
-   
-    global _sew_instanceEdit
-   
-    # Make a new instance, keeping it in a global variable to avoid multiple instances being opened
-
-    if _sew_instanceEdit is not None:
-        # Already an instance (make it really obvious - focused, in front and under cursor, like other Nuke GUI windows)
-        _sew_instanceEdit.show()
-        _sew_instanceEdit.activateWindow()
-        _sew_instanceEdit.raise_()
-        return
-    
-    def when_closedEdit():
-        global _sew_instanceEdit
-        _sew_instanceEdit = None
+    t0 = time.perf_counter()
                 
-    for n in nuke.selectedNodes():
-        n.setSelected(False)
-        if n.Class() == 'BackdropNode':
-            n.setSelected(True)    
+    nodes = wrapped(selected_backdrops)()
             
-    if len(nuke.selectedNodes()) >= 1:
-        _sew_instanceEdit = BackdropManagerUI()
-        _sew_instanceEdit.switch()
-    
-        _sew_instanceEdit.closed.connect(when_closedEdit)
-    
-        modal = False
-        if modal:
-            _sew_instanceEdit.exec_()
-        else:
-            _sew_instanceEdit.show()
+    if nodes:
+        dialog = _ui_instance()
+        dialog.reset()
+        dialog.switch(nodes)
+        _show(dialog, t0)
+
+def _warm():
+    """ Builds the font list and the backdrop dialog while Nuke is idle. """
+    font_model()
+    _ui_instance()
              
 def nuke_setup():
     """ Call this from menu.py to setup"""
@@ -1896,9 +2044,50 @@ def nuke_setup():
     nuke.menu("Nuke").addCommand("Edit/Backdrop Manager Settings", gui)
     nuke.menu("Node Graph").addCommand("Create Backdrop", guiUI, d['shortcut'])
     nuke.menu("Node Graph").addCommand("Snap Backdrop", wrapped(snap), d['snap'])    
+    nuke.menu("Node Graph").addCommand("Backdrop Manager/Pack Backdrops", wrapped(pack))
+    nuke.menu("Node Graph").addCommand("Backdrop Manager/Normalize Z Order", wrapped(layout.normalize_z_order))
+    nuke.menu("Node Graph").addCommand("Backdrop Manager/Auto Wrap Nodes", wrapped(auto_wrap))
+    nuke.menu("Node Graph").addCommand("Backdrop Manager/Wrap Write Trees", wrapped(wrap_writes))
+    nuke.menu("Node Graph").addCommand("Backdrop Manager/Wrap Read Branches", wrapped(wrap_reads))
+    nuke.menu("Node Graph").addCommand("Backdrop Manager/Create Backdrops From Spec...", wrapped(create_from_spec))
+    nuke.menu("Node Graph").addCommand("Backdrop Manager/Export Layout...", timed(export_layout))
+    nuke.menu("Node Graph").addCommand("Backdrop Manager/Import Layout...", timed(import_layout))
+    nuke.menu("Node Graph").addCommand("Backdrop Manager/Compare Layout With Script...", timed(compare_layout))
+
+    # One key per preset, straight to the node graph
+    for i in range(min(len(d['colors']), QUICK_PRESETS)):
+        nuke.menu("Node Graph").addCommand("Backdrop Manager/Preset Backdrop/Preset %d" % (i + 1),
+                                           partial(wrapped(quick_backdrop), i), quick_shortcut(d['quick_backdrop'], i))
+        nuke.menu("Node Graph").addCommand("Backdrop Manager/Preset Color/Preset %d" % (i + 1),
+                                           partial(wrapped(quick_recolor), i), quick_shortcut(d['quick_recolor'], i))
+
     panels.registerWidgetAsPanel('nuke.BP', 'Backdrop Manager', 'BackdropPanel')
+    panels.registerWidgetAsPanel('nuke.BackdropMinimap', 'Backdrop Overview', 'BackdropMinimap')
     
     nuke.BP = BackdropPanel
+    nuke.BackdropMinimap = minimap.BackdropMinimap
+
+    # Keep the backdrop registry up to date
+    install_registry()
+
+    # Live follow, opt-in
+    if nuke.GUI and d['live_follow']:
+        follow.enable(d['padding'])
+    else:
+        follow.disable()
+
+    # Local usage log, opt-in
+    if d['telemetry']:
+        telemetry.enable()
+    else:
+        telemetry.disable()
+
+    # Build the font list and backdrop dialog once Nuke is idle, so Ctrl+B only has to show it
+    if nuke.GUI:
+        QtCore.QTimer.singleShot(0, _warm)
+
+# Saving the settings re-registers the menus and hotkeys
+core.settings_saved.append(nuke_setup)
 
 if __name__ == "__main__":
     nuke_setup()
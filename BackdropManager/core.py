@@ -0,0 +1,447 @@
+""" Backdrop logic without any Qt: colors, labels, bounds, creating, restyling and recoloring backdrops,
+and the settings file. The dialogs and panel are built on top of it, and terminal sessions (nuke -t)
+and farm-side script fixers can use it on its own:
+
+    from BackdropManager import core
+    core.restyle_all(core.Overrides().restore())
+
+Every standard knob is passed to the BackdropNode constructor; only the custom knobs of the
+Backdrop Settings tab are added afterwards.
+"""
+import os
+import traceback
+
+import nuke
+
+from BackdropManager import geometry
+from BackdropManager.registry import registry, group_key, CLASSES
+
+nuke_ver = nuke.NUKE_VERSION_MAJOR
+
+# Script of the "Snap to selected nodes" button on every backdrop
+SNAP_SCRIPT = ("this = nuke.thisNode()\nselNodes = nuke.selectedNodes()\npadding = this.knob('padding').value()\n"
+               "if len(selNodes)== 0:\n\tpass\nelse:\n"
+               "\tbdX = min([node.xpos() for node in selNodes]) - padding\n"
+               "\tbdY = min([node.ypos() for node in selNodes]) - padding - 60\n"
+               "\tbdW = max([node.xpos() + node.screenWidth() for node in selNodes]) + padding\n"
+               "\tbdH = max([node.ypos() + node.screenHeight() for node in selNodes]) + padding\n"
+               "\tthis.knob('xpos').setValue(bdX)\n\tthis.knob('ypos').setValue(bdY)\n"
+               "\tthis.knob('bdwidth').setValue(bdW-bdX)\n\tthis.knob('bdheight').setValue(bdH-bdY)")
+
+def interface2rgb(hexValue, normalize = True):
+    """ Convert a color stored as a 32 bit value as used by nuke for interface colors to normalized rgb values. """
+    return [(0xFF & hexValue >>  i) / 255.0 for i in [24,16,8]]
+
+def rgb2hex(rgbaValues):
+    """Convert a color stored as normalized rgb values to a hex. """
+    rgbaValues = [int(i * 255) for i in rgbaValues]
+
+    if len(rgbaValues) < 3:
+        return
+
+    return '#%02x%02x%02x' % (rgbaValues[0],rgbaValues[1],rgbaValues[2])
+
+def hex2rgb(hexColor):
+    """ Convert a color stored as hex to rgb values. """
+    hexColor = hexColor.lstrip('#')
+    return tuple(int(hexColor[i:i+2], 16) for i in (0, 2 ,4))
+
+def hex2interface(hexColor):
+    """ Convert a color stored as hex to a 32 bit value as used by nuke for interface colors. """
+    hexColor = hexColor.lstrip('#')
+    return int(hexColor+'00', 16)
+
+def rgb2interface(rgb):
+    """ Convert a color stored as rgb values to a 32 bit value as used by nuke for interface colors. """
+    return int('%02x%02x%02x%02x' % (int(rgb[0]*255), int(rgb[1]*255), int(rgb[2]*255),1),16)
+
+def split_label(lbl):
+    """ Splits a backdrop label into (align, bold, italic, text). """
+    align = 'center' if '<center>' in lbl else 'left'
+    return (align, '<b>' in lbl, '<i>' in lbl, lbl.split(">")[-1])
+
+def make_label(text, align, bold=False, italic=False):
+    """ Builds a backdrop label from its text and formatting. """
+    b = "<b>" if bold else ""
+    i = "<i>" if italic else ""
+    return "<" + align + ">" + b + i + text
+
+def backdrop_knobs(bounds=None, label='', color=None, z_order=0, bookmark=True, font=None, font_size=None,
+                   style=None, width=None, selected=False):
+    """ Returns BackdropNode constructor arguments. bounds is (x1, y1, x2, y2), style and width only
+    apply from Nuke 12 on, and None leaves a knob at its default. """
+    knobs = {'label': label, 'z_order': z_order, 'bookmark': bool(bookmark), 'selected': selected}
+    if bounds is not None:
+        knobs.update(xpos=int(bounds[0]), ypos=int(bounds[1]),
+                     bdwidth=int(bounds[2] - bounds[0]), bdheight=int(bounds[3] - bounds[1]))
+    if color is not None:
+        knobs['tile_color'] = color
+    if font is not None:
+        knobs['note_font'] = font
+    if font_size is not None:
+        knobs['note_font_size'] = font_size
+    if nuke_ver >= 12:
+        if style is not None:
+            knobs['appearance'] = style
+        if width is not None:
+            knobs['border_width'] = width
+    return knobs
+
+def add_backdrop_knobs(n, padding):
+    """ Adds the Backdrop Settings tab with the padding knob and snap button, unless already there. """
+    if 'padding' not in n.knobs():
+        # Shows label and z order on the new tab too
+        n.addKnob(n.knob('label'))
+        n.addKnob(n.knob('z_order'))
+    knobs = n.knobs()
+    user = knobs.get('User')
+    if user is not None:
+        user.setName("backdrop_settings")
+        user.setLabel("Backdrop Settings")
+    if 'padding' not in knobs:
+        k = nuke.Int_Knob('padding', 'Padding')
+        n.addKnob(k)
+        k.setValue(padding)
+    if 'snap' not in knobs:
+        k = nuke.PyScript_Knob('snap', 'Snap to selected nodes')
+        k.setValue(SNAP_SCRIPT)
+        n.addKnob(k)
+
+def backdrop_bounds(n):
+    """ Returns (x1, y1, x2, y2) of a backdrop. """
+    x = n.xpos()
+    y = n.ypos()
+    return (x, y, x + int(n['bdwidth'].value()), y + int(n['bdheight'].value()))
+
+def node_bounds(n):
+    """ Returns (x1, y1, x2, y2) of a node as drawn in the DAG. """
+    x = n.xpos()
+    y = n.ypos()
+    return (x, y, x + n.screenWidth(), y + n.screenHeight())
+
+def set_bounds(n, bounds):
+    """ Moves and resizes a backdrop to (x1, y1, x2, y2). """
+    n.knob('bdwidth').setValue(int(bounds[2] - bounds[0]))
+    n.knob('xpos').setValue(int(bounds[0]))
+    n.knob('bdheight').setValue(int(bounds[3] - bounds[1]))
+    n.knob('ypos').setValue(int(bounds[1]))
+
+def selected_backdrops(classes=('BackdropNode',)):
+    """ Returns the selected backdrops in the current group, looked up in the registry. """
+    return registry.nodes(group_key(nuke.thisGroup()), classes, selected=True)
+
+def filter(list):
+    """ Filter through selected backdrops for the largest. """
+    backdrop_dict = {}
+    area = []
+    for x in list:
+        if x.Class() == 'BackdropNode':
+            a = int(x['bdwidth'].value() * x['bdheight'].value())
+            backdrop_dict[x] = a
+            area.append(a)
+    area.sort()
+    return(area, backdrop_dict)
+
+def snap():    
+    """ Snap backdrops to the selected nodes. """
+    settings = Overrides()        
+    d = settings.restore()        
+    selNodes = nuke.selectedNodes()
+    padding = d['padding']
+    
+    if len(selNodes) == 0: 
+        return
+        
+    else:
+        a = filter(selNodes)[0]
+        b = filter(selNodes)[1]
+        
+        if a == []:          
+            return
+            
+        else:
+            #nuke.Undo.begin()
+            largest = [k for k, v in b.items() if v == a[-1]][0]
+            selNodes.remove(largest)
+            this = largest
+            bounds = geometry.snap_bounds([node_bounds(node) for node in selNodes], padding)
+            set_bounds(this, bounds)
+            #nuke.Undo.end()
+            registry.refresh_nodes([this])
+
+def create_backdrop(nodes, padding, **style):
+    """ Makes a backdrop around the given nodes, or where Nuke puts new nodes when there are none,
+    in one undo step. style takes the backdrop_knobs arguments. """
+    bounds = None
+    if nodes:
+        bounds = geometry.snap_bounds([node_bounds(node) for node in nodes], padding)
+    knobs = backdrop_knobs(bounds, selected=True, **style)
+
+    # Start a new undo block to group the backdrop creation actions
+    nuke.Undo.begin('Create Backdrop')
+
+    try:
+        if bounds is not None:
+            n = nuke.nodes.BackdropNode(**knobs)
+        else:
+            # Let Nuke place it
+            n = nuke.createNode('BackdropNode', inpanel=False)
+            del knobs['selected']
+            for k, v in knobs.items():
+                n[k].setValue(v)
+            # onCreate registered Nuke's defaults
+            registry.refresh_nodes([n])
+        add_backdrop_knobs(n, padding)
+
+    except Exception as e:
+        # In case of any error, cancel the undo block to discard the changes
+        nuke.Undo.cancel()
+        print(f"Error creating backdrop: {e}")
+
+    else:
+        # End the undo block, confirming the changes
+        nuke.Undo.end()
+        return n
+
+# Presets with quick-apply hotkeys
+QUICK_PRESETS = 9
+
+def quick_backdrop(index):
+    """ Makes a backdrop around the selection in color preset index, with the preset's label and the
+    saved style, without opening the dialog. """
+    d = Overrides().restore()
+    if index >= len(d['colors']):
+        return
+    labels = d.get('labels') or []
+    text = labels[index] if index < len(labels) else ""
+
+    selected = nuke.selectedNodes()
+    # Below any backdrop being wrapped, like the dialog
+    z = d['zorder']
+    backdrops = [n for n in selected if n.Class() == 'BackdropNode']
+    if backdrops:
+        z = min([n['z_order'].value() for n in backdrops]) - 1
+
+    create_backdrop(selected, d['padding'],
+                    label=make_label(text, d['align'], d['bold'] == True, d['italic'] == True),
+                    color=rgb2interface(d['colors'][index]), z_order=z, bookmark=d['bookmark'],
+                    font=d['font'], font_size=d['font_size'], style=d['style'], width=d['width'])
+
+def quick_recolor(index):
+    """ Sets the selected backdrops and sticky notes to color preset index. """
+    d = Overrides().restore()
+    if index >= len(d['colors']):
+        return
+    color = rgb2interface(d['colors'][index])
+    nuke.Undo.begin('Recolor Backdrops')
+    try:
+        recolor(selected_backdrops(CLASSES), color)
+    except Exception:
+        nuke.Undo.cancel()
+        traceback.print_exc()
+    else:
+        nuke.Undo.end()
+
+def quick_shortcut(pattern, index):
+    """ The hotkey for a preset, pattern with # standing for its number. No hotkey without a #. """
+    if not pattern or '#' not in pattern:
+        return ''
+    return pattern.replace('#', str(index + 1))
+
+def recolor(nodes, color):
+    """ Sets the tile color of the given backdrops and sticky notes to an interface color. """
+    for n in nodes:
+        n.knob('tile_color').setValue(color)
+    registry.refresh_nodes(nodes)
+
+def toggle_appearance(nodes):
+    """ Toggles backdrops between border and fill. """
+    for n in nodes:
+        if n['appearance'].value() == 'Fill':
+            n.knob('appearance').setValue('Border')
+        else:
+            n.knob('appearance').setValue('Fill')
+
+def restyle(nodes, d):
+    """ Applies the settings style d to the given backdrops, keeping their label text. """
+    for n in nodes:
+        lbl = split_label(n['label'].value())[3]
+        n.knob('label').setValue(make_label(lbl, d['align'], d['bold'] == True, d['italic'] == True))
+        n.knob('note_font').setValue(d['font'])
+        n.knob('note_font_size').setValue(d['font_size'])
+        if nuke_ver >= 12:
+            n.knob('appearance').setValue(d['style'])
+            n.knob('border_width').setValue(d['width'])
+        n.knob('bookmark').setValue(d['bookmark'])
+    registry.refresh_nodes(nodes)
+
+def restyle_all(d):
+    """ Applies the settings style d to every backdrop in the current group, and inside every group in
+    it as well when d['recurse_groups'] is on, in one undo step. Returns [(group, count)]. """
+    current = group_key(nuke.thisGroup())
+
+    if d['recurse_groups']:
+        # Group list taken once for the whole operation
+        groups = registry.groups(current)
+    else:
+        groups = [current]
+
+    report = []
+    nuke.Undo.begin('Restyle Backdrops')
+    try:
+        for group in groups:
+            nodes = registry.nodes(group, ('BackdropNode',))
+            restyle(nodes, d)
+            report.append((group or 'root', len(nodes)))
+    except Exception:
+        nuke.Undo.cancel()
+        traceback.print_exc()
+        return
+    else:
+        nuke.Undo.end()
+
+    if len(groups) > 1:
+        print("BackdropManager: restyled %d backdrops in %d groups" % (sum(c for g, c in report), len(report)))
+        for group, count in report:
+            print("    %s: %d" % (group, count))
+    return report
+
+# Called after the settings are saved, the UI adds its menu setup here
+settings_saved = []
+
+# Settings JSON file
+def _load_yaml(path):
+    def _load_internal():
+        import json
+        if not os.path.isfile(path):
+            print("Settings file %r does not exist" % (path))
+            return
+        f = open(path)
+        overrides = json.load(f)
+        f.close()
+        return overrides
+
+    # Catch any errors, print traceback and continue
+    try:
+        return _load_internal()
+    except Exception:
+        print("Error loading %r" % path)
+        import traceback
+        traceback.print_exc()
+
+        return None
+
+def _save_yaml(obj, path):
+    def _save_internal():
+        import json
+        ndir = os.path.dirname(path)
+        if not os.path.isdir(ndir):
+            try:
+                os.makedirs(ndir)
+            except OSError as e:
+                if e.errno != 17:  # errno 17 is "already exists"
+                    raise
+
+        f = open(path, "w")
+        json.dump(obj, fp=f, sort_keys=True, indent=1, separators=(',', ': '))
+        f.write("\n")
+        f.close()
+
+    # Catch any errors, print traceback and continue
+    try:
+        _save_internal()
+    except Exception:
+        print("Error saving BackdropManager settings")
+        import traceback
+        traceback.print_exc()
+
+class Overrides(object):
+    def __init__(self):
+        self.settings_path = os.path.expanduser("~/.nuke/BackdropManager/backdropmanager_settings.json")
+
+    def save(self):
+        settings = {
+            'settings': self.defaults,
+            'version': 3,
+                    }
+        _save_yaml(obj=settings, path=self.settings_path)
+       
+        for callback in settings_saved:
+            callback()
+
+    def clear(self):
+        # Default
+        self.defaults = {
+            'colors': [(0.26, 0.26, 0.26), (0.32, 0.255, 0.19), (0.32, 0.19, 0.19), (0.32, 0.19, 0.255), (0.255, 0.19, 0.32), (0.19, 0.19, 0.32), (0.19, 0.255, 0.32), (0.19, 0.32, 0.19)],
+            'labels': ["", "", "", "", "", "", "", ""],
+            'shortcut': 'CTRL+B',
+            'snap': 'CTRL+SHIFT+B',
+            'padding': 40,
+            'style': 'Fill',
+            'width': 15,
+            'zorder': 0,
+            'bookmark': 1,
+            'font': 'Source Code Pro Light',
+            'font_size': 40,
+            'bold': False,
+            'italic': False,
+            'align': 'center',
+            'recurse_groups': False,
+            'live_follow': False,
+            'telemetry': False,
+            'quick_backdrop': 'CTRL+ALT+#',
+            'quick_recolor': 'CTRL+ALT+SHIFT+#'
+                        }
+        self.save()
+
+    def restore(self):
+        """Load the settings from disc, and update Nuke
+        """
+        settings = _load_yaml(path=self.settings_path)
+
+        self.defaults = {
+            'colors': [(0.26, 0.26, 0.26), (0.32, 0.255, 0.19), (0.32, 0.19, 0.19), (0.32, 0.19, 0.255), (0.255, 0.19, 0.32), (0.19, 0.19, 0.32), (0.19, 0.255, 0.32), (0.19, 0.32, 0.19)],
+            'labels': ["", "", "", "", "", "", "", ""],
+            'shortcut': 'CTRL+B',
+            'snap': 'CTRL+SHIFT+B',
+            'padding': 40,
+            'style': 'Fill',
+            'width': 15,
+            'zorder': 0,
+            'bookmark': 1,
+            'font': 'Source Code Pro Light',
+            'font_size': 40,
+            'bold': False,
+            'italic': False,
+            'align': 'center',
+            'recurse_groups': False,
+            'live_follow': False,
+            'telemetry': False,
+            'quick_backdrop': 'CTRL+ALT+#',
+            'quick_recolor': 'CTRL+ALT+SHIFT+#'
+                        }
+
+        if settings is None:
+            self.clear()
+            return self.defaults
+
+        elif int(settings['version']) >= 2:
+            defaults = self.defaults
+            self.defaults = settings['settings']
+            # Fill in options added since the file was saved
+            for k, v in defaults.items():
+                self.defaults.setdefault(k, v)
+            return self.defaults
+
+        else:
+            nuke.warning("Wrong version of backdrop manager config, nothing loaded (version %s loaded, version 3 is the latest), path was %r. Please either delete your settings file or re-download the latest BackdropManager." % (
+                int(settings['version']),
+                self.settings_path))
+            return
+
+    def load(self):
+        settings = {
+            'settings': self.defaults,
+            'version': 3,
+                    }
+        return settings
@@ -0,0 +1,140 @@
+""" Compares the backdrop layouts of two scripts. Pure Python, so .nk files can be compared offline:
+
+    python -m BackdropManager.diff old.nk new.nk
+
+Backdrops are matched by full name through dicts. The ones left over are then matched within their
+group by identical bounds, then by the best overlap above MIN_OVERLAP, found through a grid instead of
+pairwise tests. Exits with 1 when the layouts differ, like diff.
+"""
+import re
+import sys
+
+from BackdropManager import geometry, nk
+
+# Least intersection over union for a geometric match
+MIN_OVERLAP = 0.5
+
+# Change kinds, in report order
+KINDS = ('removed', 'added', 'renamed', 'moved', 'resized', 'recoloured', 'relabelled')
+
+_markup = re.compile(r'<[^>]*>')
+
+class Backdrop(object):
+    """ The compared values of one backdrop. """
+    __slots__ = ('name', 'group', 'bounds', 'color', 'label')
+
+    def __init__(self, name, bounds, color, label):
+        self.name = name
+        self.group = name.rpartition('.')[0]
+        self.bounds = tuple(bounds)
+        self.color = color
+        self.label = label
+
+    def text(self):
+        return _markup.sub('', self.label).strip() or self.name
+
+def nk_layout(path):
+    """ Returns {full name: Backdrop} for the backdrops of a .nk file. """
+    layout = {}
+    for n in nk.read_script(path):
+        if n.cls == 'BackdropNode':
+            layout[n.fullName()] = Backdrop(n.fullName(), n.bounds(), n.number('tile_color'), n.value('label', ''))
+    return layout
+
+def records_layout(records):
+    """ Returns {full name: Backdrop} for registry records of an open script. """
+    return dict((r.name, Backdrop(r.name, (r.x, r.y, r.x + r.w, r.y + r.h), r.color, r.label)) for r in records)
+
+def _overlap(a, b):
+    if not geometry.intersects(a, b):
+        return 0.0
+    i = (min(a[2], b[2]) - max(a[0], b[0])) * (min(a[3], b[3]) - max(a[1], b[1]))
+    return i / float(geometry.area(a) + geometry.area(b) - i)
+
+def match(old, new):
+    """ Returns (pairs, removed, added): matched (old, new) Backdrops and the unmatched ones of each side. """
+    pairs = [(old[k], new[k]) for k in old if k in new]
+    removed = [old[k] for k in old if k not in new]
+    added = dict((k, b) for k, b in new.items() if k not in old)
+
+    # Renamed but not moved
+    exact = {}
+    for k, b in added.items():
+        exact.setdefault((b.group, b.bounds), []).append(k)
+    left = []
+    for b in removed:
+        keys = exact.get((b.group, b.bounds))
+        while keys and keys[-1] not in added:
+            keys.pop()
+        if keys:
+            pairs.append((b, added.pop(keys.pop())))
+        else:
+            left.append(b)
+
+    # Renamed and moved a little: best overlap in the same group
+    if left and added:
+        keys = list(added)
+        rects = [added[k].bounds for k in keys]
+        grid = geometry.Grid()
+        for i, r in enumerate(rects):
+            grid.insert(i, r)
+        removed = []
+        for b in left:
+            best = None
+            score = MIN_OVERLAP
+            for i in grid.near(b.bounds):
+                k = keys[i]
+                if k in added and added[k].group == b.group:
+                    s = _overlap(b.bounds, added[k].bounds)
+                    if s >= score:
+                        best, score = k, s
+            if best is None:
+                removed.append(b)
+            else:
+                pairs.append((b, added.pop(best)))
+    else:
+        removed = left
+    return pairs, removed, list(added.values())
+
+def diff(old, new):
+    """ Compares two {full name: Backdrop} layouts. Returns a list of (kind, old, new, detail) changes
+    sorted by kind then name, old or new being None for added and removed backdrops. """
+    pairs, removed, added = match(old, new)
+    changes = [('removed', b, None, '') for b in removed]
+    changes += [('added', None, b, '') for b in added]
+    for a, b in pairs:
+        if a.name != b.name:
+            changes.append(('renamed', a, b, '%s -> %s' % (a.name, b.name)))
+        if a.bounds[:2] != b.bounds[:2]:
+            changes.append(('moved', a, b, '(%d, %d) -> (%d, %d)' % (a.bounds[:2] + b.bounds[:2])))
+        sa = (a.bounds[2] - a.bounds[0], a.bounds[3] - a.bounds[1])
+        sb = (b.bounds[2] - b.bounds[0], b.bounds[3] - b.bounds[1])
+        if sa != sb:
+            changes.append(('resized', a, b, '%dx%d -> %dx%d' % (sa + sb)))
+        if a.color != b.color:
+            changes.append(('recoloured', a, b, '#%08x -> #%08x' % (a.color, b.color)))
+        if a.label != b.label:
+            changes.append(('relabelled', a, b, '%r -> %r' % (a.label, b.label)))
+    order = dict((k, i) for i, k in enumerate(KINDS))
+    changes.sort(key=lambda c: (order[c[0]], (c[2] or c[1]).name))
+    return changes
+
+def format_change(change):
+    """ One line describing a change, for a terminal or a list widget. """
+    kind, a, b, detail = change
+    bd = b or a
+    line = '%-11s %s (%s)' % (kind, bd.text(), bd.name)
+    return line + ': ' + detail if detail else line
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 2:
+        sys.stderr.write("usage: python -m BackdropManager.diff old.nk new.nk\n")
+        return 2
+    changes = diff(nk_layout(argv[0]), nk_layout(argv[1]))
+    for c in changes:
+        sys.stdout.write(format_change(c) + '\n')
+    return 1 if changes else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,143 @@
+""" Live-follow mode: backdrops grow as the nodes inside them are moved.
+
+A global knobChanged hook records moved nodes; a throttled timer then grows only the backdrops those
+nodes were in when they started moving, with the snap padding. A drag of many nodes is coalesced into
+one refit per backdrop per tick, and nothing scans the whole script.
+"""
+import nuke
+
+try:
+    from Qt import QtCore
+except ImportError:
+    try:
+        from PySide2 import QtCore
+    except ImportError:
+        from PySide import QtCore
+
+from BackdropManager import geometry
+from BackdropManager.registry import registry
+from BackdropManager.core import backdrop_bounds, node_bounds, set_bounds
+from BackdropManager.query import query
+
+# Refit interval in milliseconds
+INTERVAL = 50
+
+def _bounds(n):
+    if n.Class() == 'BackdropNode':
+        return backdrop_bounds(n)
+    return node_bounds(n)
+
+class LiveFollow(object):
+    def __init__(self, padding=40):
+        self.padding = padding
+        # Nodes moved since the last tick, by full name
+        self.moved = {}
+        # Backdrops each moving node belonged to when it started moving
+        self.members = {}
+        # Bounds of nodes that started moving since the last tick, taken on their first change
+        self.starts = {}
+        self.timer = QtCore.QTimer()
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(INTERVAL)
+        self.timer.timeout.connect(self.refit)
+
+    def knobChanged(self):
+        k = nuke.thisKnob()
+        if k is None or k.name() not in ('xpos', 'ypos'):
+            return
+        n = nuke.thisNode()
+        name = n.fullName()
+        if name not in self.members and name not in self.starts:
+            # By the tick the node may have left its backdrops, remember where it started
+            self.starts[name] = _bounds(n)
+        self.moved[name] = n
+        if not self.timer.isActive():
+            self.timer.start()
+
+    def _startMembers(self, name, rect):
+        """ Backdrops holding the node's centre as it starts moving. """
+        group = name.rpartition('.')[0]
+        cx = (rect[0] + rect[2]) // 2
+        cy = (rect[1] + rect[3]) // 2
+        members = {}
+        for r in query(region=(cx, cy, cx, cy), group=group, classes=('BackdropNode',)):
+            if r.name == name:
+                continue
+            bd = r.node()
+            if bd is None:
+                continue
+            b = backdrop_bounds(bd)
+            if b[0] <= cx <= b[2] and b[1] <= cy <= b[3]:
+                members[r.name] = bd
+        return members
+
+    def refit(self):
+        moved = self.moved
+        self.moved = {}
+        targets = {}
+
+        for name, n in moved.items():
+            start = self.starts.pop(name, None)
+            try:
+                rect = _bounds(n)
+            except ValueError:
+                # Deleted
+                continue
+            members = self.members.get(name)
+            if members is None:
+                members = self.members[name] = self._startMembers(name, start or rect)
+
+            for bd_name, bd in list(members.items()):
+                try:
+                    current = targets[bd_name][1] if bd_name in targets else backdrop_bounds(bd)
+                except ValueError:
+                    del members[bd_name]
+                    continue
+                if not geometry.intersects(current, rect):
+                    # Dragged clean out, let it go
+                    del members[bd_name]
+                    continue
+                target = geometry.union([current, geometry.snap_bounds([rect], self.padding)])
+                if target != current:
+                    targets[bd_name] = (bd, target)
+
+        # Nodes that stopped moving start a new drag next time
+        for name in list(self.members):
+            if name not in moved:
+                del self.members[name]
+
+        if not targets:
+            return
+        fitted = []
+        nuke.Undo.begin('Follow Nodes')
+        try:
+            for bd, bounds in targets.values():
+                try:
+                    set_bounds(bd, bounds)
+                except ValueError:
+                    continue
+                fitted.append(bd)
+        finally:
+            nuke.Undo.end()
+        registry.refresh_nodes(fitted)
+
+_follow = None
+
+def enable(padding=40):
+    """ Turns live-follow on, or updates its padding. """
+    global _follow
+    if _follow is None:
+        _follow = LiveFollow(padding)
+        nuke.addKnobChanged(_follow.knobChanged)
+    _follow.padding = padding
+
+def disable():
+    """ Turns live-follow off. """
+    global _follow
+    if _follow is not None:
+        nuke.removeKnobChanged(_follow.knobChanged)
+        _follow.timer.stop()
+        _follow = None
+
+def is_enabled():
+    return _follow is not None
@@ -0,0 +1,270 @@
+""" Rectangle helpers for backdrop layout. Pure Python, no Nuke or Qt.
+
+Rectangles are (x1, y1, x2, y2) tuples in DAG coordinates, y pointing down.
+"""
+import math
+import heapq
+
+def area(r):
+    return (r[2] - r[0]) * (r[3] - r[1])
+
+def contains(outer, inner):
+    """ True if inner lies entirely inside outer. """
+    return outer[0] <= inner[0] and outer[1] <= inner[1] and inner[2] <= outer[2] and inner[3] <= outer[3]
+
+def intersects(a, b):
+    """ True if a and b overlap with a positive area. """
+    return a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]
+
+def union(rects):
+    """ Returns the bounding rectangle of the given rectangles. """
+    rects = list(rects)
+    return (min(r[0] for r in rects), min(r[1] for r in rects),
+            max(r[2] for r in rects), max(r[3] for r in rects))
+
+class Grid(object):
+    """ Uniform grid of rectangle indices, for point and region lookups without pairwise tests. """
+    def __init__(self, cell=512):
+        self.cell = cell
+        self.cells = {}
+
+    def _range(self, r):
+        c = self.cell
+        return (int(r[0] // c), int(r[1] // c), int(r[2] // c), int(r[3] // c))
+
+    def insert(self, i, r):
+        cx1, cy1, cx2, cy2 = self._range(r)
+        for cx in range(cx1, cx2 + 1):
+            for cy in range(cy1, cy2 + 1):
+                self.cells.setdefault((cx, cy), []).append(i)
+
+    def at(self, x, y):
+        """ Returns the indices whose cells hold the point. """
+        return self.cells.get((int(x // self.cell), int(y // self.cell)), ())
+
+    def near(self, r):
+        """ Returns the set of indices whose cells touch the rectangle. """
+        found = set()
+        cx1, cy1, cx2, cy2 = self._range(r)
+        for cx in range(cx1, cx2 + 1):
+            for cy in range(cy1, cy2 + 1):
+                found.update(self.cells.get((cx, cy), ()))
+        return found
+
+def _cell_size(rects):
+    """ Grid cell around the median rectangle size. """
+    if not rects:
+        return 512
+    sizes = sorted(max(r[2] - r[0], r[3] - r[1]) for r in rects)
+    return max(64, sizes[len(sizes) // 2])
+
+def parents(rects):
+    """ Returns, for each rectangle, the index of the smallest other rectangle containing it, or None.
+    Identical rectangles nest in list order. """
+    order = sorted(range(len(rects)), key=lambda i: (-area(rects[i]), i))
+    grid = Grid(_cell_size(rects))
+    result = [None] * len(rects)
+    for i in order:
+        r = rects[i]
+        best = None
+        # Anything containing r also holds its top-left corner
+        for j in grid.at(r[0], r[1]):
+            if contains(rects[j], r) and (best is None or area(rects[j]) <= area(rects[best])):
+                best = j
+        result[i] = best
+        grid.insert(i, r)
+    return result
+
+def depths(parent):
+    """ Returns the nesting depth of each entry of a parents() list, 0 for top level. """
+    depth = [None] * len(parent)
+    for i in range(len(parent)):
+        # Walk up to the first known depth, then fill in the chain on the way back
+        chain = []
+        j = i
+        while j is not None and depth[j] is None:
+            chain.append(j)
+            j = parent[j]
+        d = -1 if j is None else depth[j]
+        for k in reversed(chain):
+            d += 1
+            depth[k] = d
+    return depth
+
+def nested_z(parent, z):
+    """ Returns z orders where every entry sits above its parent (see parents()), changing as few as possible:
+    top-level entries keep theirs, children are raised to their parent's plus one when not already above. """
+    depth = depths(parent)
+    result = list(z)
+    for i in sorted(range(len(z)), key=lambda i: depth[i]):
+        p = parent[i]
+        if p is not None and result[i] <= result[p]:
+            result[i] = result[p] + 1
+    return result
+
+def assign(rects, containers):
+    """ Returns, for each rectangle, the index of the smallest container holding its centre, or None. """
+    grid = Grid(_cell_size(containers))
+    for i, c in enumerate(containers):
+        grid.insert(i, c)
+    result = []
+    for r in rects:
+        x = (r[0] + r[2]) * 0.5
+        y = (r[1] + r[3]) * 0.5
+        best = None
+        for j in grid.at(x, y):
+            c = containers[j]
+            if c[0] <= x <= c[2] and c[1] <= y <= c[3] and (best is None or area(c) < area(containers[best])):
+                best = j
+        result.append(best)
+    return result
+
+def reading_order(rects):
+    """ Returns the indices of the rectangles in reading order: rows top to bottom, left to right in a row.
+    A rectangle joins the current row while its vertical centre lies within the row's extent. """
+    by_y = sorted(range(len(rects)), key=lambda i: (rects[i][1] + rects[i][3], rects[i][0]))
+    rows = []
+    top = bottom = None
+    for i in by_y:
+        r = rects[i]
+        cy = (r[1] + r[3]) * 0.5
+        if rows and top <= cy <= bottom:
+            rows[-1].append(i)
+            top = min(top, r[1])
+            bottom = max(bottom, r[3])
+        else:
+            rows.append([i])
+            top, bottom = r[1], r[3]
+    order = []
+    for row in rows:
+        order.extend(sorted(row, key=lambda i: rects[i][0]))
+    return order
+
+def shelf_pack(sizes, gap=0, max_width=None, obstacles=()):
+    """ Packs (width, height) blocks left to right on shelves, keeping their order.
+    Returns the (x, y) offset of each block. The shelf width defaults to roughly a square layout.
+    Blocks stay gap away from the obstacles, rectangles in offset coordinates, skipping right past
+    them, or below them when a shelf has no room left. """
+    if not sizes:
+        return []
+    if max_width is None:
+        total = sum((w + gap) * (h + gap) for w, h in sizes)
+        max_width = int(math.sqrt(total) * 1.5)
+    max_width = max(max_width, max(w for w, h in sizes))
+
+    grid = Grid(_cell_size(obstacles))
+    for i, r in enumerate(obstacles):
+        grid.insert(i, r)
+
+    def blocking(r):
+        return [obstacles[i] for i in grid.near(r) if intersects(obstacles[i], r)]
+
+    offsets = []
+    x = y = shelf = 0
+    for w, h in sizes:
+        while True:
+            if x > 0 and x + w > max_width:
+                if shelf:
+                    y += shelf + gap
+                else:
+                    # Obstacles filled this shelf before any block, start below the one ending first
+                    row = blocking((-gap, y - gap, max_width + gap, y + h + gap))
+                    y = min(r[3] for r in row) + gap if row else y + h + gap
+                x = shelf = 0
+            hits = blocking((x - gap, y - gap, x + w + gap, y + h + gap))
+            if not hits:
+                break
+            x = max(r[2] for r in hits) + gap
+        offsets.append((x, y))
+        x += w + gap
+        shelf = max(shelf, h)
+    return offsets
+
+def clusters(points, distance, min_points=3):
+    """ Groups (x, y) points with DBSCAN: points with at least min_points neighbours (themselves included)
+    within distance are cores, and clusters are the cores reachable from each other plus the points next
+    to them. Neighbours come from a grid of distance-sized cells, so only the 3x3 cells around each point
+    are searched. Returns lists of point indices; isolated points are left out. """
+    grid = {}
+    for i, (x, y) in enumerate(points):
+        grid.setdefault((int(x // distance), int(y // distance)), []).append(i)
+    d2 = distance * distance
+
+    def neighbours(i):
+        x, y = points[i]
+        cx = int(x // distance)
+        cy = int(y // distance)
+        found = []
+        for gx in (cx - 1, cx, cx + 1):
+            for gy in (cy - 1, cy, cy + 1):
+                for j in grid.get((gx, gy), ()):
+                    px, py = points[j]
+                    if (px - x) * (px - x) + (py - y) * (py - y) <= d2:
+                        found.append(j)
+        return found
+
+    NOISE = -1
+    label = [None] * len(points)
+    result = []
+    for i in range(len(points)):
+        if label[i] is not None:
+            continue
+        near = neighbours(i)
+        if len(near) < min_points:
+            label[i] = NOISE
+            continue
+        c = len(result)
+        members = []
+        queue = near
+        while queue:
+            j = queue.pop()
+            if label[j] == NOISE:
+                # Border point, doesn't expand the cluster
+                label[j] = c
+                members.append(j)
+            if label[j] is not None:
+                continue
+            label[j] = c
+            members.append(j)
+            near = neighbours(j)
+            if len(near) >= min_points:
+                queue.extend(near)
+        result.append(members)
+    return result
+
+def snap_bounds(rects, padding):
+    """ Backdrop bounds around the given rectangles, with the same padding as snapping:
+    padding on every side plus 60 extra at the top for the label. """
+    x1, y1, x2, y2 = union(rects)
+    return (x1 - padding, y1 - padding - 60, x2 + padding, y2 + padding)
+
+def _sweep(events, cross):
+    # events: (x1, tag, index, rect) sorted by x1, tag 0 or 1. Yields ((tag, i), (tag, j)) for pairs
+    # overlapping in y while both are active, between tags when cross is set, else within a tag.
+    active = ({}, {})
+    ends = []
+    for x1, tag, i, r in events:
+        # Retire everything ending before this one starts
+        while ends and ends[0][0] <= x1:
+            end, otag, j = heapq.heappop(ends)
+            active[otag].pop(j, None)
+        otag = 1 - tag if cross else tag
+        for j, o in active[otag].items():
+            if o[1] < r[3] and r[1] < o[3]:
+                yield (otag, j), (tag, i)
+        active[tag][i] = r
+        heapq.heappush(ends, (r[2], tag, i))
+
+def overlapping_pairs(rects):
+    """ Yields (i, j) with i < j for every pair of overlapping rectangles, sweeping along x. """
+    events = sorted((r[0], 0, i, r) for i, r in enumerate(rects))
+    for (t1, i), (t2, j) in _sweep(events, False):
+        yield (min(i, j), max(i, j))
+
+def crossing_pairs(rects, others):
+    """ Yields (i, j) for every rectangle rects[i] overlapping others[j], sweeping along x. """
+    events = [(r[0], 0, i, r) for i, r in enumerate(rects)]
+    events += [(r[0], 1, j, r) for j, r in enumerate(others)]
+    events.sort(key=lambda e: (e[0], e[1], e[2]))
+    for (t1, i), (t2, j) in _sweep(events, True):
+        yield (i, j) if t1 == 0 else (j, i)
@@ -0,0 +1,77 @@
+""" Dependency walks over a node graph. Pure Python, no Nuke or Qt.
+
+Graphs are dicts mapping a node name to the names of its inputs. Walks are iterative, so deep
+chains don't hit the recursion limit.
+"""
+
+def outputs(inputs):
+    """ Returns the reverse of an inputs graph: node name to the names of the nodes it feeds. """
+    result = dict((name, []) for name in inputs)
+    for name, ins in inputs.items():
+        for i in ins:
+            result.setdefault(i, []).append(name)
+    return result
+
+def topological(inputs, roots):
+    """ Returns the nodes upstream of the roots, roots included, each after all of its inputs. """
+    order = []
+    state = {}
+    for root in roots:
+        stack = [(root, False)]
+        while stack:
+            name, done = stack.pop()
+            if done:
+                order.append(name)
+                state[name] = 2
+                continue
+            if name in state:
+                continue
+            state[name] = 1
+            stack.append((name, True))
+            for i in inputs.get(name, ()):
+                if i not in state:
+                    stack.append((i, False))
+    return order
+
+def upstream_sets(inputs, roots):
+    """ Returns {root: set of the nodes upstream of it, itself included}.
+
+    The upstream set of every node feeding more than one node is computed once, inputs first, and
+    reused by every walk reaching it, so shared subtrees aren't walked again. """
+    order = topological(inputs, roots)
+    feeds = {}
+    for name in order:
+        for i in inputs.get(name, ()):
+            feeds[i] = feeds.get(i, 0) + 1
+    memo = {}
+
+    def walk(start):
+        found = set()
+        stack = [start]
+        while stack:
+            name = stack.pop()
+            if name in found:
+                continue
+            if name != start and name in memo:
+                found |= memo[name]
+                continue
+            found.add(name)
+            stack.extend(inputs.get(name, ()))
+        return found
+
+    for name in order:
+        if feeds.get(name, 0) > 1:
+            memo[name] = frozenset(walk(name))
+    return dict((root, memo[root] if root in memo else walk(root)) for root in roots)
+
+def branch(outputs, start, stop):
+    """ Returns the nodes downstream of start, itself included, up to but excluding the nodes
+    for which stop(name) is true. """
+    found = set([start])
+    stack = [start]
+    while stack:
+        for o in outputs.get(stack.pop(), ()):
+            if o not in found and not stop(o):
+                found.add(o)
+                stack.append(o)
+    return found
@@ -0,0 +1,247 @@
+""" Node graph layout commands for backdrops. Run inside the group to work on (see wrapped()). """
+import os
+import re
+
+import nuke
+
+from BackdropManager import geometry, graph
+from BackdropManager.registry import registry, group_key
+from BackdropManager.core import (rgb2interface, make_label, backdrop_knobs, add_backdrop_knobs,
+                                  backdrop_bounds, node_bounds, set_bounds)
+
+def pack_backdrops(gap=40):
+    """ Packs the top-level backdrops of the current group on shelves, in reading order, without overlap.
+    Each backdrop moves as a rigid block with the nodes and backdrops inside it, in one undo step.
+    Nodes outside every backdrop stay put and the blocks are packed around them. """
+    group = group_key(nuke.thisGroup())
+    backdrops = registry.nodes(group, ('BackdropNode',))
+    if not backdrops:
+        return
+    rects = [backdrop_bounds(n) for n in backdrops]
+
+    # Blocks are the backdrops not nested in another one
+    parent = geometry.parents(rects)
+    tops = [i for i, p in enumerate(parent) if p is None]
+    top_rects = [rects[i] for i in tops]
+
+    # Everything else moves with the top-level backdrop holding its centre
+    members = [[] for i in tops]
+    loose = []
+    top_set = set(backdrops[i].name() for i in tops)
+    others = [n for n in nuke.allNodes() if n.name() not in top_set]
+    other_rects = [node_bounds(n) for n in others]
+    for n, r, k in zip(others, other_rects, geometry.assign(other_rects, top_rects)):
+        if k is None:
+            loose.append(r)
+        else:
+            members[k].append(n)
+
+    order = geometry.reading_order(top_rects)
+    sizes = [(top_rects[k][2] - top_rects[k][0], top_rects[k][3] - top_rects[k][1]) for k in order]
+    origin = geometry.union(top_rects)
+    obstacles = [(r[0] - origin[0], r[1] - origin[1], r[2] - origin[0], r[3] - origin[1]) for r in loose]
+    offsets = geometry.shelf_pack(sizes, gap, obstacles=obstacles)
+
+    nuke.Undo.begin('Pack Backdrops')
+    try:
+        for k, (ox, oy) in zip(order, offsets):
+            dx = origin[0] + ox - top_rects[k][0]
+            dy = origin[1] + oy - top_rects[k][1]
+            if not dx and not dy:
+                continue
+            for n in [backdrops[tops[k]]] + members[k]:
+                n.setXYpos(n.xpos() + dx, n.ypos() + dy)
+    except Exception:
+        nuke.Undo.cancel()
+        raise
+    else:
+        nuke.Undo.end()
+
+    # setXYpos doesn't go through knobChanged
+    registry.refresh(group)
+
+def audit():
+    """ Finds every pair of partially overlapping backdrops (not clean nesting) and every node straddling
+    a backdrop edge in the current group. Returns a list of (kind, backdrop, other) tuples,
+    kind being 'overlap' (other is a backdrop) or 'straddle' (other is a node). """
+    backdrops = registry.nodes(group_key(nuke.thisGroup()), ('BackdropNode',))
+    rects = [backdrop_bounds(n) for n in backdrops]
+    issues = []
+
+    for i, j in sorted(geometry.overlapping_pairs(rects)):
+        a, b = rects[i], rects[j]
+        if not geometry.contains(a, b) and not geometry.contains(b, a):
+            # Larger one first, it's the one grown when resolving
+            if geometry.area(a) < geometry.area(b):
+                i, j = j, i
+            issues.append(('overlap', backdrops[i], backdrops[j]))
+
+    nodes = [n for n in nuke.allNodes() if n.Class() != 'BackdropNode']
+    boxes = [node_bounds(n) for n in nodes]
+    for i, j in sorted(geometry.crossing_pairs(rects, boxes)):
+        if not geometry.contains(rects[i], boxes[j]):
+            issues.append(('straddle', backdrops[i], nodes[j]))
+    return issues
+
+def resolve(issues, mode='grow', padding=40):
+    """ Fixes audit() issues in one undo step, with the same padding as snapping.
+
+    grow: the backdrop grows around the straddling node, or the larger of two overlapping backdrops
+          grows around the smaller one.
+    shrink: the backdrop, or the smaller of two overlapping ones, is refit around the nodes whose
+            centre lies inside it. """
+    targets = {}
+    nodes = None
+    for kind, bd, other in issues:
+        try:
+            if mode == 'grow':
+                key = bd.fullName()
+                current = targets.get(key, (bd, backdrop_bounds(bd)))[1]
+                box = backdrop_bounds(other) if kind == 'overlap' else node_bounds(other)
+                targets[key] = (bd, geometry.union([current, geometry.snap_bounds([box], padding)]))
+            else:
+                if kind == 'overlap':
+                    bd = other
+                key = bd.fullName()
+                if key in targets:
+                    continue
+                if nodes is None:
+                    nodes = [(n, node_bounds(n)) for n in nuke.allNodes() if n.Class() != 'BackdropNode']
+                r = backdrop_bounds(bd)
+                inside = [b for n, b in nodes if r[0] <= (b[0] + b[2]) * 0.5 <= r[2] and r[1] <= (b[1] + b[3]) * 0.5 <= r[3]]
+                if inside:
+                    targets[key] = (bd, geometry.snap_bounds(inside, padding))
+        except ValueError:
+            # Node deleted since the audit
+            continue
+
+    nuke.Undo.begin('Resolve Backdrop Overlaps')
+    try:
+        for bd, bounds in targets.values():
+            set_bounds(bd, bounds)
+    except Exception:
+        nuke.Undo.cancel()
+        raise
+    else:
+        nuke.Undo.end()
+    registry.refresh(group_key(nuke.thisGroup()))
+
+def normalize_z_order():
+    """ Raises the z order of nested backdrops in the current group so every child sits above its parent.
+    Only backdrops whose value changes are written, in one undo step. Returns how many changed. """
+    group = group_key(nuke.thisGroup())
+    backdrops = registry.nodes(group, ('BackdropNode',))
+    rects = [backdrop_bounds(n) for n in backdrops]
+    z = [int(n['z_order'].value()) for n in backdrops]
+    new = geometry.nested_z(geometry.parents(rects), z)
+
+    changed = [(n, v) for n, old, v in zip(backdrops, z, new) if v != old]
+    if not changed:
+        return 0
+
+    nuke.Undo.begin('Normalize Backdrop Z Order')
+    try:
+        for n, v in changed:
+            n['z_order'].setValue(v)
+    except Exception:
+        nuke.Undo.cancel()
+        raise
+    else:
+        nuke.Undo.end()
+    registry.refresh(group)
+    return len(changed)
+
+def auto_wrap(settings, distance=150, min_nodes=3):
+    """ Wraps every cluster of nodes not inside a backdrop in the current group in a new backdrop.
+    Clusters are found with geometry.clusters() on the node centres, distance apart at most. Backdrops
+    use the settings defaults and take the preset colors in turn, in reading order, in one undo step.
+    Returns the new backdrops. """
+    group = group_key(nuke.thisGroup())
+    containers = [backdrop_bounds(n) for n in registry.nodes(group, ('BackdropNode',))]
+    nodes = [n for n in nuke.allNodes() if n.Class() != 'BackdropNode']
+    rects = [node_bounds(n) for n in nodes]
+    loose = [r for r, k in zip(rects, geometry.assign(rects, containers)) if k is None]
+    centres = [((r[0] + r[2]) * 0.5, (r[1] + r[3]) * 0.5) for r in loose]
+
+    found = geometry.clusters(centres, distance, min_nodes)
+    if not found:
+        return []
+    bounds = [geometry.snap_bounds([loose[i] for i in members], settings['padding']) for members in found]
+    return create_backdrops([(b, None) for b in bounds], settings, 'Auto Wrap Nodes')
+
+def create_backdrops(entries, settings, undo='Create Backdrops'):
+    """ Creates a backdrop for each (bounds, text) entry with the settings defaults, in one undo step.
+    They take the preset colors in turn, in reading order, and the preset label when text is None.
+    Returns the new backdrops. """
+    if not entries:
+        return []
+    colors = settings['colors']
+    labels = settings['labels']
+    order = geometry.reading_order([b for b, text in entries])
+
+    created = []
+    nuke.Undo.begin(undo)
+    try:
+        for k, i in enumerate(order):
+            bounds, text = entries[i]
+            c = k % len(colors)
+            if text is None:
+                text = labels[c] if c < len(labels) else ''
+            label = make_label(text, settings['align'], settings['bold'], settings['italic'])
+            knobs = backdrop_knobs(bounds, label, rgb2interface(colors[c]), settings['zorder'], settings['bookmark'],
+                                   settings['font'], settings['font_size'], settings['style'], settings['width'])
+            n = nuke.nodes.BackdropNode(**knobs)
+            add_backdrop_knobs(n, settings['padding'])
+            created.append(n)
+    except Exception:
+        nuke.Undo.cancel()
+        raise
+    else:
+        nuke.Undo.end()
+    return created
+
+# Nodes ending a Read branch
+MERGE_CLASSES = ('Merge', 'Merge2', 'MergeExpression', 'Keymix', 'Dissolve', 'ChannelMerge')
+
+def file_label(n):
+    """ Label text from a Read or Write file name: the base name without frame field and extension.
+    Trailing padding (#, @, %04d, $F4) is stripped, a frame number only when it sits between dots
+    before the extension, as in name.1001.exr, so comp_v003.mov and plate_1080.exr keep their digits. """
+    path = n['file'].value() if 'file' in n.knobs() else ''
+    name, ext = os.path.splitext(os.path.basename(path))
+    name = re.sub(r'[._]?(#+|@+|%0?\d*d|\$F\d*)$', '', name)
+    if ext:
+        name = re.sub(r'\.\d+$', '', name)
+    return name or n.name()
+
+def _graph():
+    """ Returns the nodes of the current group by name, and their inputs graph. """
+    nodes = dict((n.name(), n) for n in nuke.allNodes() if n.Class() not in ('BackdropNode', 'StickyNote'))
+    inputs = {}
+    for name, n in nodes.items():
+        inputs[name] = [i.name() for i in n.dependencies(nuke.INPUTS | nuke.HIDDEN_INPUTS) if i.name() in nodes]
+    return nodes, inputs
+
+def _wrap(nodes, sets, settings, undo):
+    entries = []
+    for n, members in sets:
+        rects = [node_bounds(nodes[m]) for m in members]
+        entries.append((geometry.snap_bounds(rects, settings['padding']), file_label(n)))
+    return create_backdrops(entries, settings, undo)
+
+def wrap_write_trees(settings):
+    """ Wraps the upstream tree of each Write in the current group in a backdrop labelled from its file.
+    Returns the new backdrops. """
+    nodes, inputs = _graph()
+    writes = sorted(name for name, n in nodes.items() if n.Class() == 'Write')
+    trees = graph.upstream_sets(inputs, writes)
+    return _wrap(nodes, [(nodes[w], trees[w]) for w in writes], settings, 'Wrap Write Trees')
+
+def wrap_read_branches(settings):
+    """ Wraps each Read in the current group and the nodes below it, up to the first merge, in a backdrop
+    labelled from its file. Returns the new backdrops. """
+    nodes, inputs = _graph()
+    outputs = graph.outputs(inputs)
+    stop = lambda name: nodes[name].Class() in MERGE_CLASSES
+    reads = sorted(name for name, n in nodes.items() if n.Class() == 'Read')
+    return _wrap(nodes, [(nodes[r], graph.branch(outputs, r, stop)) for r in reads], settings, 'Wrap Read Branches')
@@ -0,0 +1,227 @@
+""" Saves the backdrop layout of a script to a file and re-applies it to another version of the script.
+
+Layout files are JSON lines: a header line, then one compact record per backdrop, written and read
+one at a time so large scripts never build the whole file in memory.
+"""
+import json
+
+import nuke
+
+from BackdropManager import geometry
+from BackdropManager.registry import registry
+from BackdropManager.query import plain_label
+from BackdropManager.core import backdrop_knobs, add_backdrop_knobs, backdrop_bounds, node_bounds
+
+FORMAT = 'BackdropManager layout'
+VERSION = 1
+
+nuke_ver = nuke.NUKE_VERSION_MAJOR
+
+# Record keys and their types, then the ones a record may leave out
+FIELDS = {
+    'name': str,
+    'label': str,
+    'bounds': list,
+    'color': int,
+    'z_order': int,
+    'font': str,
+    'font_size': int,
+    'bookmark': bool,
+    }
+OPTIONAL_FIELDS = {
+    'group': str,
+    'members': list,
+    'style': str,
+    'width': int,
+    'padding': int,
+    }
+
+def _group_node(key):
+    return nuke.root() if not key else nuke.toNode('root.' + key)
+
+def _members(group, backdrops):
+    """ Returns, for each backdrop, the names of the nodes whose centre lies in it and in no smaller one. """
+    nodes = [n for n in group.nodes() if n.Class() not in ('BackdropNode', 'StickyNote')]
+    members = [[] for n in backdrops]
+    rects = [backdrop_bounds(n) for n in backdrops]
+    for n, k in zip(nodes, geometry.assign([node_bounds(n) for n in nodes], rects)):
+        if k is not None:
+            members[k].append(n.name())
+    return members
+
+def _record(n, group, members):
+    knobs = n.knobs()
+    x1, y1, x2, y2 = backdrop_bounds(n)
+    record = {
+        'group': group,
+        'name': n.name(),
+        'label': n['label'].value(),
+        'bounds': [x1, y1, x2, y2],
+        'color': int(n['tile_color'].value()),
+        'z_order': int(n['z_order'].value()),
+        'font': n['note_font'].value(),
+        'font_size': int(n['note_font_size'].value()),
+        'bookmark': bool(n['bookmark'].value()),
+        'members': members,
+        }
+    if 'appearance' in knobs:
+        record['style'] = knobs['appearance'].value()
+        record['width'] = int(knobs['border_width'].value())
+    if 'padding' in knobs:
+        record['padding'] = int(knobs['padding'].value())
+    return record
+
+def export_layout(path):
+    """ Writes every backdrop of the script, in every group, to a layout file. Returns how many. """
+    count = 0
+    with open(path, 'w') as f:
+        f.write(json.dumps({'format': FORMAT, 'version': VERSION}) + '\n')
+        for key in registry.groups():
+            group = _group_node(key)
+            backdrops = registry.nodes(key, ('BackdropNode',))
+            if group is None or not backdrops:
+                continue
+            for n, members in zip(backdrops, _members(group, backdrops)):
+                f.write(json.dumps(_record(n, key, members), separators=(',', ':')) + '\n')
+                count += 1
+    return count
+
+def _check(record):
+    """ Returns what is wrong with a record, or None. """
+    if not isinstance(record, dict):
+        return "not a backdrop record"
+    for key in FIELDS:
+        if key not in record:
+            return "missing %r" % key
+    for key, kind in list(FIELDS.items()) + list(OPTIONAL_FIELDS.items()):
+        if key in record and not isinstance(record[key], kind):
+            return "%r must be of type %s, not %r" % (key, kind.__name__, record[key])
+    bounds = record['bounds']
+    if len(bounds) != 4 or not all(isinstance(v, (int, float)) for v in bounds):
+        return "'bounds' must be [x1, y1, x2, y2]"
+    return None
+
+def read_layout(path):
+    """ Yields the records of a layout file, raising ValueError with the line number of a bad one. """
+    with open(path) as f:
+        try:
+            header = json.loads(f.readline() or '{}')
+        except ValueError:
+            header = {}
+        if not isinstance(header, dict) or header.get('format') != FORMAT:
+            raise ValueError("%r is not a backdrop layout file" % path)
+        if header.get('version', 0) > VERSION:
+            raise ValueError("%r was saved by a newer BackdropManager" % path)
+        for number, line in enumerate(f, 2):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                raise ValueError("%s, line %d: %s" % (path, number, e))
+            problem = _check(record)
+            if problem:
+                raise ValueError("%s, line %d: %s" % (path, number, problem))
+            yield record
+
+class _Target(object):
+    """ Lookups of the backdrops of one group in the open script: by name, by unique label and by member. """
+    def __init__(self, key):
+        self.group = _group_node(key)
+        self.backdrops = dict((n.name(), n) for n in registry.nodes(key, ('BackdropNode',)))
+        labels = {}
+        for name, n in self.backdrops.items():
+            labels.setdefault(plain_label(n['label'].value()), []).append(name)
+        # Ambiguous labels can't be matched
+        self.labels = dict((l, names[0]) for l, names in labels.items() if l and len(names) == 1)
+        self._owner = None
+        self.used = set()
+
+    def owner(self):
+        """ Node name to the backdrop it sits in, built on first use. """
+        if self._owner is None:
+            self._owner = {}
+            names = list(self.backdrops)
+            for name, members in zip(names, _members(self.group, [self.backdrops[b] for b in names])):
+                for m in members:
+                    self._owner[m] = name
+        return self._owner
+
+    def match(self, record):
+        """ Returns the unused backdrop matching a record by name, then label, then most shared members. """
+        name = record['name']
+        if name in self.backdrops and name not in self.used:
+            return name
+        name = self.labels.get(plain_label(record['label']))
+        if name is not None and name not in self.used:
+            return name
+        if record.get('members'):
+            owner = self.owner()
+            votes = {}
+            for m in record['members']:
+                b = owner.get(m)
+                if b is not None and b not in self.used:
+                    votes[b] = votes.get(b, 0) + 1
+            if votes:
+                return max(sorted(votes), key=votes.get)
+        return None
+
+def _values(record):
+    """ Knob values of a record, as set on an existing backdrop. """
+    knobs = backdrop_knobs(record['bounds'], record['label'], record['color'], record['z_order'],
+                           record['bookmark'], record['font'], record['font_size'],
+                           record.get('style'), record.get('width'))
+    del knobs['selected']
+    return knobs
+
+def import_layout(path, settings, create_missing=True):
+    """ Applies a layout file to the open script in one undo step. Backdrops are matched within their
+    group by name, then by unique label, then by the member nodes they hold; only knobs whose value
+    differs are written. Unmatched records become new backdrops when create_missing is set, with their
+    saved padding or the settings padding.
+    Returns (updated, created, skipped) counts. """
+    targets = {}
+    changes = []
+    missing = []
+    skipped = 0
+    for record in read_layout(path):
+        key = record.get('group', '')
+        if key not in targets:
+            targets[key] = _Target(key)
+        target = targets[key]
+        if target.group is None:
+            skipped += 1
+            continue
+        name = target.match(record)
+        if name is None:
+            missing.append((target.group, record))
+            continue
+        target.used.add(name)
+        n = target.backdrops[name]
+        values = [(k, v) for k, v in _values(record).items() if n[k].value() != v]
+        if values:
+            changes.append((n, values))
+
+    created = 0
+    nuke.Undo.begin('Import Backdrop Layout')
+    try:
+        for n, values in changes:
+            for k, v in values:
+                n[k].setValue(v)
+        if create_missing:
+            for group, record in missing:
+                with group:
+                    n = nuke.nodes.BackdropNode(**_values(record))
+                    add_backdrop_knobs(n, record.get('padding', settings['padding']))
+                created += 1
+    except Exception:
+        nuke.Undo.cancel()
+        raise
+    else:
+        nuke.Undo.end()
+
+    for key in targets:
+        registry.refresh(key)
+    if not create_missing:
+        skipped += len(missing)
+    return len(changes), created, skipped
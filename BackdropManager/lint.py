@@ -0,0 +1,219 @@
+""" Checks the backdrops of .nk files against the show's conventions before publishing. Pure Python,
+the scripts are parsed with nk and checked in a process pool, one file per task:
+
+    python -m BackdropManager.lint [--config rules.json] [--settings FILE] [--jobs N] [--format json] a.nk b.nk
+
+Rules, all on by default:
+    palette   tile colors from the palette, compared as rgb
+    font      note_font is the configured font
+    overlap   backdrops of a group overlap only by nesting
+    label     every backdrop has label text
+    snap      the embedded snap button script is no longer than max_snap_bytes
+
+The config is a JSON dict overriding DEFAULTS, e.g.
+
+    {"rules": ["palette", "overlap", "label"], "palette": ["#424242", [0.32, 0.19, 0.19]]}
+
+--settings takes the palette and font from a BackdropManager settings file, the config still wins.
+Without a palette or a font, those rules pass. Exits with 1 when any backdrop breaks a rule, 2 when a
+file can't be read or parsed, like a compiler.
+"""
+import re
+import sys
+import json
+import argparse
+
+from BackdropManager import geometry, nk
+
+DEFAULTS = {
+    'rules': ['palette', 'font', 'overlap', 'label', 'snap'],
+    # '#rrggbb' strings or normalized rgb, None allows any color
+    'palette': None,
+    'font': None,
+    'max_snap_bytes': 2048,
+    }
+
+# Nuke's values for knobs a script leaves out
+DEFAULT_FONT = 'Verdana'
+
+_markup = re.compile(r'<[^>]*>')
+
+def color_key(value):
+    """ Returns the rgb part of a palette entry, '#rrggbb' or normalized rgb, as a 24 bit int. """
+    if isinstance(value, str):
+        return int(value.lstrip('#')[:6], 16)
+    r, g, b = [int(c * 255) for c in value[:3]]
+    return (r << 16) | (g << 8) | b
+
+def load_config(path=None, settings=None):
+    """ Returns DEFAULTS updated from a BackdropManager settings file, then from a JSON config. """
+    config = dict(DEFAULTS)
+    if settings:
+        with open(settings) as f:
+            s = json.load(f).get('settings', {})
+        if s.get('colors'):
+            config['palette'] = s['colors']
+        if s.get('font'):
+            config['font'] = s['font']
+    if path:
+        with open(path) as f:
+            overrides = json.load(f)
+        unknown = set(overrides) - set(DEFAULTS)
+        if unknown:
+            raise ValueError("unknown config keys: %s" % ', '.join(sorted(unknown)))
+        config.update(overrides)
+    unknown = set(config['rules']) - set(RULES)
+    if unknown:
+        raise ValueError("unknown rules: %s" % ', '.join(sorted(unknown)))
+    return config
+
+# Rules take the backdrops of one script and the config, and yield (node, message)
+def check_palette(backdrops, config):
+    if not config['palette']:
+        return
+    palette = set(color_key(c) for c in config['palette'])
+    for n in backdrops:
+        color = n.number('tile_color', None)
+        if color is None:
+            yield n, "default color, not from the palette"
+        elif color >> 8 not in palette:
+            yield n, "color #%06x is not in the palette" % (color >> 8)
+
+def font_family(used, font):
+    """ True if a note_font value is the font, also with a style suffix ("Verdana Bold"). """
+    words = used.lower().split(" ")
+    font = font.lower()
+    while words:
+        if " ".join(words) == font:
+            return True
+        words.pop(-1)
+    return False
+
+def check_font(backdrops, config):
+    font = config['font']
+    if not font:
+        return
+    for n in backdrops:
+        used = n.value('note_font', DEFAULT_FONT)
+        if not font_family(used, font):
+            yield n, "font %r, not %r" % (used, font)
+
+def check_overlap(backdrops, config):
+    groups = {}
+    for n in backdrops:
+        groups.setdefault(n.group, []).append(n)
+    for nodes in groups.values():
+        rects = [n.bounds() for n in nodes]
+        for i, j in sorted(geometry.overlapping_pairs(rects)):
+            a, b = rects[i], rects[j]
+            if not geometry.contains(a, b) and not geometry.contains(b, a):
+                yield nodes[i], "overlaps %s" % nodes[j].fullName()
+
+def check_label(backdrops, config):
+    for n in backdrops:
+        if not _markup.sub('', n.value('label', '')).strip():
+            yield n, "no label"
+
+def check_snap(backdrops, config):
+    limit = config['max_snap_bytes']
+    for n in backdrops:
+        words = n.user_knob('snap')
+        # {22 snap l "Snap to selected nodes" T "script" +STARTLINE}
+        if words and 'T' in words[2:-1]:
+            script = words[words.index('T', 2) + 1]
+            if len(script) > limit:
+                yield n, "snap script is %d bytes, more than %d" % (len(script), limit)
+
+RULES = {
+    'palette': check_palette,
+    'font': check_font,
+    'overlap': check_overlap,
+    'label': check_label,
+    'snap': check_snap,
+    }
+
+def lint_nodes(nodes, config):
+    """ Returns the issues of a script's NkNodes as (rule, node full name, message), in rule order. """
+    backdrops = [n for n in nodes if n.cls == 'BackdropNode']
+    issues = []
+    for rule in config['rules']:
+        for n, message in RULES[rule](backdrops, config):
+            issues.append((rule, n.fullName(), message))
+    return len(backdrops), issues
+
+def lint_file(path, config):
+    """ Lints one .nk file. Returns a report dict: path, backdrops, issues and error. """
+    report = {'path': path, 'backdrops': 0, 'issues': [], 'error': None}
+    try:
+        nodes = nk.read_script(path)
+    except (IOError, OSError, UnicodeDecodeError) as e:
+        report['error'] = str(e)
+        return report
+    try:
+        count, issues = lint_nodes(nodes, config)
+    except Exception as e:
+        # Knob values that don't parse fail this file only, not the whole pool run
+        report['error'] = "can't parse: %s: %s" % (type(e).__name__, e)
+        return report
+    report['backdrops'] = count
+    report['issues'] = [{'rule': r, 'node': name, 'message': m} for r, name, m in issues]
+    return report
+
+def lint_files(paths, config, jobs=None):
+    """ Lints .nk files in a process pool, returning their reports in the given order.
+    jobs=1, or a single file, runs in this process. """
+    if jobs == 1 or len(paths) < 2:
+        return [lint_file(p, config) for p in paths]
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        return list(pool.map(lint_file, paths, [config] * len(paths)))
+
+def format_report(reports):
+    """ One line per issue, path:node: rule: message, then a summary. """
+    lines = []
+    for r in reports:
+        if r['error']:
+            lines.append("%s: error: %s" % (r['path'], r['error']))
+        for i in r['issues']:
+            lines.append("%s:%s: %s: %s" % (r['path'], i['node'], i['rule'], i['message']))
+    count = sum(len(r['issues']) for r in reports)
+    lines.append("%d issues in %d of %d files" % (count, sum(1 for r in reports if r['issues']), len(reports)))
+    return '\n'.join(lines)
+
+def _jobs(value):
+    try:
+        jobs = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError("%r is not a number" % value)
+    if jobs < 1:
+        raise argparse.ArgumentTypeError("must be at least 1, not %d" % jobs)
+    return jobs
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m BackdropManager.lint', description=__doc__.split('\n')[0])
+    parser.add_argument('paths', nargs='+', metavar='nk')
+    parser.add_argument('--config', help="JSON file overriding the default rules and limits")
+    parser.add_argument('--settings', help="BackdropManager settings file to take the palette and font from")
+    parser.add_argument('--jobs', type=_jobs, help="worker processes, default one per CPU")
+    parser.add_argument('--format', choices=('text', 'json'), default='text')
+    args = parser.parse_args(argv)
+
+    try:
+        config = load_config(args.config, args.settings)
+    except (IOError, OSError, ValueError) as e:
+        sys.stderr.write("lint: %s\n" % e)
+        return 2
+
+    reports = lint_files(args.paths, config, args.jobs)
+    if args.format == 'json':
+        json.dump({'version': 1, 'rules': config['rules'], 'files': reports}, sys.stdout, indent=1)
+        sys.stdout.write('\n')
+    else:
+        sys.stdout.write(format_report(reports) + '\n')
+
+    if any(r['error'] for r in reports):
+        return 2
+    return 1 if any(r['issues'] for r in reports) else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
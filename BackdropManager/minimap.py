@@ -0,0 +1,211 @@
+""" Dockable overview of the backdrops in the current script.
+
+Every backdrop is a QGraphicsItem with its own device coordinate cache, so when the registry reports a
+change only that item is repainted. Labels are drawn only when the item is large enough on screen.
+"""
+import nuke
+
+try:
+    from Qt import QtCore, QtGui, QtWidgets
+    from Qt.QtCore import Qt
+except ImportError:
+    try:
+        from PySide2 import QtCore, QtGui, QtWidgets
+        from PySide2.QtCore import Qt
+    except ImportError:
+        from PySide import QtCore, QtGui, QtGui as QtWidgets
+        from PySide.QtCore import Qt
+
+from BackdropManager.registry import registry
+from BackdropManager.query import plain_label
+
+# Minimum on-screen height, in pixels, before labels are drawn
+LABEL_LOD = 14
+
+def _qcolor(tile_color):
+    if not tile_color:
+        # Unset, Nuke's default backdrop grey
+        return QtGui.QColor(0x88, 0x88, 0x88)
+    return QtGui.QColor((tile_color >> 24) & 0xFF, (tile_color >> 16) & 0xFF, (tile_color >> 8) & 0xFF)
+
+class BackdropItem(QtWidgets.QGraphicsRectItem):
+    def __init__(self, record):
+        QtWidgets.QGraphicsRectItem.__init__(self)
+        self.name = record.name
+        self.setCacheMode(QtWidgets.QGraphicsItem.DeviceCoordinateCache)
+        self.setRecord(record)
+
+    def setRecord(self, record):
+        """ Updates the item from a registry record, invalidating only its own cache. """
+        self.color = _qcolor(record.color)
+        self.text = plain_label(record.label)
+        self.bookmark = record.bookmark
+        self.setZValue(record.z)
+        self.setRect(QtCore.QRectF(record.x, record.y, record.w, record.h))
+        self.setToolTip(self.text or self.name)
+        self.update()
+
+    def paint(self, painter, option, widget=None):
+        r = self.rect()
+        painter.fillRect(r, self.color)
+        lod = option.levelOfDetailFromTransform(painter.worldTransform())
+        if self.bookmark:
+            pen = QtGui.QPen(QtGui.QColor(255, 200, 0))
+            pen.setCosmetic(True)
+            pen.setWidth(2)
+            painter.setPen(pen)
+            painter.drawRect(r)
+        if self.text and r.height() * lod >= LABEL_LOD:
+            painter.save()
+            # Draw the label at a fixed screen size
+            painter.translate(r.topLeft())
+            painter.scale(1.0 / lod, 1.0 / lod)
+            painter.setPen(QtGui.QColor(230, 230, 230))
+            painter.drawText(QtCore.QRectF(4, 2, r.width() * lod - 8, r.height() * lod - 4),
+                             Qt.AlignLeft | Qt.AlignTop | Qt.TextWordWrap, self.text)
+            painter.restore()
+
+class MinimapView(QtWidgets.QGraphicsView):
+    backdropClicked = QtCore.Signal(str)
+
+    def __init__(self, scene, parent=None):
+        QtWidgets.QGraphicsView.__init__(self, scene, parent)
+        self.setRenderHint(QtGui.QPainter.Antialiasing, False)
+        self.setViewportUpdateMode(QtWidgets.QGraphicsView.SmartViewportUpdate)
+        self.setOptimizationFlag(QtWidgets.QGraphicsView.DontSavePainterState, True)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.setBackgroundBrush(QtGui.QColor(40, 40, 40))
+
+    def fit(self):
+        rect = self.scene().itemsBoundingRect()
+        if not rect.isEmpty():
+            self.fitInView(rect, Qt.KeepAspectRatio)
+
+    def resizeEvent(self, evt):
+        QtWidgets.QGraphicsView.resizeEvent(self, evt)
+        self.fit()
+
+    def mousePressEvent(self, evt):
+        # Topmost backdrop under the cursor
+        for item in self.items(evt.pos()):
+            if isinstance(item, BackdropItem):
+                self.backdropClicked.emit(item.name)
+                return
+        QtWidgets.QGraphicsView.mousePressEvent(self, evt)
+
+def zoom_to(name, select=False):
+    """ Zooms the DAG to fit a backdrop, opening its group if needed, and optionally selects its contents. """
+    r = registry.record(name)
+    bd = r.node() if r is not None else None
+    if bd is None:
+        return
+    if r.group:
+        group = nuke.toNode('root.' + r.group)
+        nuke.showDag(group)
+    else:
+        group = nuke.root()
+
+    from BackdropManager.backdrop_manager import get_current_dag
+    dag = get_current_dag()
+    scale = 1.0
+    if dag is not None and r.w and r.h:
+        scale = min(dag.width() / float(r.w), dag.height() / float(r.h)) * 0.9
+
+    with group:
+        if select:
+            for n in nuke.selectedNodes():
+                n.setSelected(False)
+            bd.selectNodes(True)
+            bd.setSelected(True)
+        nuke.zoom(scale, [r.x + r.w * 0.5, r.y + r.h * 0.5])
+
+class BackdropMinimap(QtWidgets.QWidget):
+    """ Overview panel. Listens to the registry while shown and updates only the changed items. """
+    def __init__(self, parent=None):
+        QtWidgets.QWidget.__init__(self, parent)
+        self.group = ''
+        self.items = {}
+        self.pending = set()
+
+        layout = QtWidgets.QVBoxLayout()
+        layout.setContentsMargins(0,0,0,0)
+        layout.setSpacing(2)
+        self.setLayout(layout)
+
+        self.scene = QtWidgets.QGraphicsScene(self)
+        self.view = MinimapView(self.scene)
+        self.view.backdropClicked.connect(zoom_to)
+        layout.addWidget(self.view)
+
+        refresh = QtWidgets.QPushButton("Refresh")
+        refresh.setToolTip("Re-read backdrop positions from the script")
+        refresh.setFixedHeight(20)
+        refresh.clicked.connect(self.refresh)
+        layout.addWidget(refresh)
+
+        # Coalesce registry changes into one scene update
+        self.timer = QtCore.QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(100)
+        self.timer.timeout.connect(self.sync)
+
+    # Registry listener
+    def add(self, record):
+        self._changed(record.name)
+
+    def remove(self, record):
+        self._changed(record.name)
+
+    def clear(self):
+        for item in self.items.values():
+            self.scene.removeItem(item)
+        self.items = {}
+        self.pending = set()
+        self.timer.start()
+
+    def _changed(self, name):
+        self.pending.add(name)
+        if not self.timer.isActive():
+            self.timer.start()
+
+    def sync(self):
+        """ Applies the pending registry changes to the scene. """
+        if not self.pending:
+            # After clear(), rebuild from scratch
+            self.pending = set(r.name for r in registry.records(self.group, ('BackdropNode',)))
+        pending = self.pending
+        self.pending = set()
+        for name in pending:
+            r = registry.record(name)
+            item = self.items.get(name)
+            if r is None or r.cls != 'BackdropNode' or r.group != self.group:
+                if item is not None:
+                    self.scene.removeItem(item)
+                    del self.items[name]
+            elif item is None:
+                item = self.items[name] = BackdropItem(r)
+                self.scene.addItem(item)
+            else:
+                item.setRecord(r)
+        self.view.fit()
+
+    def refresh(self):
+        registry.refresh(self.group)
+
+    def showEvent(self, evt):
+        registry.addListener(self)
+        registry.ensure()
+        # Backdrops deleted while hidden are gone from the registry, sync drops their items
+        for name in self.items:
+            self._changed(name)
+        QtWidgets.QWidget.showEvent(self, evt)
+
+    def hideEvent(self, evt):
+        registry.removeListener(self)
+        self.timer.stop()
+        QtWidgets.QWidget.hideEvent(self, evt)
+
+    def updateValue(self):
+        ## Nuke "updateValue" fix
+        pass
@@ -0,0 +1,165 @@
+""" Reads the nodes of a .nk script without Nuke. Pure Python.
+
+Scripts are TCL-like: each node is its class name followed by a braced block of knob lines, and the
+nodes of a Group follow it up to an end_group line. The file is tokenized with one regular expression,
+so large scripts are read at the speed of the regex engine rather than character by character.
+"""
+import re
+
+# A whole "knob value" line with a plain or quoted value (the common case, matched in one go),
+# whitespace, a quoted string, a bracketed command, a brace, or a bare word
+_token = re.compile(r'^[ \t]*([A-Za-z_]\w*)[ \t]+([^\s{}"\\\[;#]+|"(?:[^"\\\n]|\\.)*")[ \t]*\r?\n'
+                    r'|[ \t\r]+|\n|;|"(?:[^"\\]|\\.)*"|\[[^\]\n]*\]|\{|\}|(?:[^\s{}"\\;]|\\.)+', re.S | re.M)
+# What matters when skipping over a braced word
+_inner = re.compile(r'"(?:[^"\\]|\\.)*"|\\.|[{}]', re.S)
+_escape = re.compile(r'\\(.)', re.S)
+_escapes = {'n': '\n', 't': '\t', 'r': '\r'}
+
+# Classes whose contents follow them up to end_group
+GROUP_CLASSES = ('Group', 'LiveGroup')
+
+# Top level commands that take a braced block but aren't nodes
+COMMANDS = ('define_window_layout_xml', 'add_layer')
+
+# Nuke's default node size, nodes don't store theirs
+NODE_WIDTH = 80
+NODE_HEIGHT = 18
+
+def _unquote(word):
+    if word.startswith('"') and word.endswith('"') and len(word) > 1:
+        word = word[1:-1]
+    if '\\' in word:
+        word = _escape.sub(lambda m: _escapes.get(m.group(1), m.group(1)), word)
+    return word
+
+def _close(text, pos):
+    """ Returns the index of the brace closing the one just before pos. """
+    depth = 1
+    for m in _inner.finditer(text, pos):
+        tok = m.group()
+        if tok == '{':
+            depth += 1
+        elif tok == '}':
+            depth -= 1
+            if not depth:
+                return m.start()
+    return len(text)
+
+def statements(text):
+    """ Yields each statement of TCL-like text as a list of words. Braced words keep their raw
+    contents, marked by being returned as a Braced string. """
+    words = []
+    pos = 0
+    end = len(text)
+    while pos < end:
+        m = _token.match(text, pos)
+        if m is None:
+            # Unterminated quote
+            pos += 1
+            continue
+        pos = m.end()
+        if m.lastindex:
+            yield [m.group(1), _unquote(m.group(2))]
+            continue
+        tok = m.group()
+        if tok == '{':
+            close = _close(text, pos)
+            if words is not None:
+                words.append(Braced(text[pos:close]))
+            pos = close + 1
+        elif tok == '\n' or tok == ';':
+            if words:
+                yield words
+            words = []
+        elif tok[0] in ' \t\r' or tok == '}':
+            # Whitespace or a stray closing brace
+            continue
+        elif tok[0] == '#' and not words:
+            # Comment, skip the rest of the line
+            words = None
+        elif words is not None:
+            words.append(_unquote(tok))
+    if words:
+        yield words
+
+class Braced(str):
+    """ The raw contents of a braced word. """
+
+class NkNode(object):
+    """ A node read from a script: its class, group ('' for the root) and knob values as strings. """
+    __slots__ = ('cls', 'group', 'knobs', 'user_knobs')
+
+    def __init__(self, cls, group, knobs, user_knobs):
+        self.cls = cls
+        self.group = group
+        self.knobs = knobs
+        self.user_knobs = user_knobs
+
+    def Class(self):
+        return self.cls
+
+    def name(self):
+        return self.knobs.get('name', '')
+
+    def fullName(self):
+        return self.group + '.' + self.name() if self.group else self.name()
+
+    def value(self, knob, default=None):
+        return self.knobs.get(knob, default)
+
+    def number(self, knob, default=0):
+        """ Returns a knob as an int, for plain and hex values, or default when unset or an expression. """
+        v = self.knobs.get(knob)
+        if v is None:
+            return default
+        try:
+            return int(v, 0)
+        except ValueError:
+            try:
+                return int(float(v))
+            except ValueError:
+                return default
+
+    def user_knob(self, name):
+        """ Returns the words of an addUserKnob definition by knob name, or None. """
+        for words in self.user_knobs:
+            if len(words) > 1 and words[1] == name:
+                return words
+        return None
+
+    def bounds(self):
+        """ Returns (x1, y1, x2, y2): a backdrop's own size, or the default node size. """
+        x = self.number('xpos')
+        y = self.number('ypos')
+        if self.cls == 'BackdropNode':
+            return (x, y, x + self.number('bdwidth', 50), y + self.number('bdheight', 50))
+        return (x, y, x + NODE_WIDTH, y + NODE_HEIGHT)
+
+def read_nodes(text):
+    """ Returns the NkNodes of a script's text, in file order. """
+    nodes = []
+    groups = []
+    for words in statements(text):
+        if words[0] == 'end_group':
+            if groups:
+                groups.pop()
+            continue
+        if len(words) != 2 or not isinstance(words[1], Braced) or not words[0][:1].isalpha() or words[0] in COMMANDS:
+            continue
+        knobs = {}
+        user_knobs = []
+        for kw in statements(words[1]):
+            if kw[0] == 'addUserKnob' and len(kw) > 1:
+                user_knobs.append(next(statements(kw[1]), []))
+            elif len(kw) > 1:
+                knobs[kw[0]] = kw[1]
+        node = NkNode(words[0], '.'.join(groups), knobs, user_knobs)
+        nodes.append(node)
+        if node.cls in GROUP_CLASSES:
+            groups.append(node.name())
+    return nodes
+
+def read_script(path):
+    """ Returns the NkNodes of a .nk file. """
+    with open(path) as f:
+        return read_nodes(f.read())
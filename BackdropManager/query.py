@@ -0,0 +1,219 @@
+""" Indexed backdrop queries.
+
+Secondary indexes on label words, colour, font, bookmark, z order and a coarse spatial grid are kept
+up to date from the registry, so queries don't touch the node graph. For example:
+
+    from BackdropManager.query import query
+    query(label='^COMP_')
+    query(color='#522f2f')
+    query(bookmark=True, z_max=-1)
+    query(region=(0, 0, 4000, 2000), contained=True)
+"""
+import re
+import bisect
+
+import nuke
+
+from BackdropManager.registry import registry, CLASSES
+
+# Size of the spatial grid cells, in DAG units
+CELL = 512
+
+_markup = re.compile(r'<[^>]*>')
+_word = re.compile(r'[^\W_]+', re.UNICODE)
+# Literal start of an anchored pattern, used to narrow label searches with the sorted label list
+_prefix = re.compile(r'\^([\w \-]+)(?![*?{|])')
+
+def plain_label(label):
+    """ Returns a label's text with the markup stripped. """
+    return _markup.sub('', label).strip()
+
+def label_words(label):
+    """ Returns the set of lowercase words in a label. """
+    return set(w.lower() for w in _word.findall(plain_label(label)))
+
+def pack_color(color):
+    """ Returns the 24 bit rgb of a packed tile_color int, '#rrggbb' string or normalized rgb sequence. """
+    if isinstance(color, str):
+        return int(color.lstrip('#')[:6], 16)
+    if isinstance(color, (list, tuple)):
+        return (int(color[0] * 255) << 16) | (int(color[1] * 255) << 8) | int(color[2] * 255)
+    return int(color) >> 8
+
+def _cells(bounds):
+    x1, y1, x2, y2 = bounds
+    for cx in range(x1 // CELL, x2 // CELL + 1):
+        for cy in range(y1 // CELL, y2 // CELL + 1):
+            yield (cx, cy)
+
+def _add(d, key, name):
+    s = d.get(key)
+    if s is None:
+        s = d[key] = set()
+    s.add(name)
+
+def _remove(d, key, name):
+    s = d.get(key)
+    if s is not None:
+        s.discard(name)
+        if not s:
+            del d[key]
+
+class BackdropIndex(object):
+    """ Secondary indexes over the registry records, maintained as a registry listener. """
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.records = {}
+        self.plain = {}
+        self.labels = []
+        self.words = {}
+        self.colors = {}
+        self.fonts = {}
+        self.bookmarks = set()
+        self.z = []
+        self.cells = {}
+
+    def add(self, r):
+        self.records[r.name] = r
+        plain = self.plain[r.name] = plain_label(r.label)
+        bisect.insort(self.labels, (plain, r.name))
+        for w in label_words(r.label):
+            _add(self.words, w, r.name)
+        _add(self.colors, r.color >> 8, r.name)
+        _add(self.fonts, r.font, r.name)
+        if r.bookmark:
+            self.bookmarks.add(r.name)
+        bisect.insort(self.z, (r.z, r.name))
+        for c in _cells(r.bounds()):
+            _add(self.cells, c, r.name)
+
+    def remove(self, r):
+        if self.records.pop(r.name, None) is None:
+            return
+        plain = self.plain.pop(r.name)
+        i = bisect.bisect_left(self.labels, (plain, r.name))
+        if i < len(self.labels) and self.labels[i] == (plain, r.name):
+            del self.labels[i]
+        for w in label_words(r.label):
+            _remove(self.words, w, r.name)
+        _remove(self.colors, r.color >> 8, r.name)
+        _remove(self.fonts, r.font, r.name)
+        self.bookmarks.discard(r.name)
+        i = bisect.bisect_left(self.z, (r.z, r.name))
+        if i < len(self.z) and self.z[i] == (r.z, r.name):
+            del self.z[i]
+        for c in _cells(r.bounds()):
+            _remove(self.cells, c, r.name)
+
+    def zRange(self, z_min=None, z_max=None):
+        """ Returns the names with z_min <= z <= z_max. """
+        lo = 0 if z_min is None else bisect.bisect_left(self.z, (z_min, ''))
+        hi = len(self.z) if z_max is None else bisect.bisect_left(self.z, (z_max + 1, ''))
+        return set(name for z, name in self.z[lo:hi])
+
+    def prefix(self, text):
+        """ Returns the names whose plain label starts with text. """
+        lo = bisect.bisect_left(self.labels, (text, ''))
+        hi = bisect.bisect_left(self.labels, (text + u'\U0010ffff', ''))
+        return set(name for plain, name in self.labels[lo:hi])
+
+    def region(self, bounds):
+        """ Returns the names whose grid cells touch the given bounds. """
+        names = set()
+        cx1, cy1, cx2, cy2 = [v // CELL for v in bounds]
+        if (cx2 - cx1 + 1) * (cy2 - cy1 + 1) > len(self.cells):
+            # A region larger than the occupied cells, walk those instead of every empty cell
+            for (cx, cy), s in self.cells.items():
+                if cx1 <= cx <= cx2 and cy1 <= cy <= cy2:
+                    names.update(s)
+            return names
+        for c in _cells(bounds):
+            s = self.cells.get(c)
+            if s:
+                names.update(s)
+        return names
+
+index = BackdropIndex()
+registry.addListener(index)
+
+def query(label=None, words=None, color=None, font=None, bookmark=None, z_min=None, z_max=None,
+          region=None, contained=False, group=None, classes=CLASSES):
+    """ Returns the registry records matching every given filter, sorted by name.
+
+    label: regular expression searched in the plain label text.
+    words: words that must all appear in the label, looked up in the word index.
+    color: packed tile_color, '#rrggbb' or normalized rgb.
+    region: (x1, y1, x2, y2) the backdrop must intersect, or lie inside when contained is set.
+    group: '' for the root, a group's full name, or None for every group. """
+    registry.ensure()
+    candidates = None
+
+    def narrow(names):
+        if candidates is None:
+            return set(names)
+        return candidates.intersection(names)
+
+    if words:
+        if isinstance(words, str):
+            words = label_words(words)
+        for w in words:
+            candidates = narrow(index.words.get(w.lower(), ()))
+    if color is not None:
+        candidates = narrow(index.colors.get(pack_color(color), ()))
+    if font is not None:
+        candidates = narrow(index.fonts.get(font, ()))
+    if bookmark:
+        candidates = narrow(index.bookmarks)
+    if z_min is not None or z_max is not None:
+        candidates = narrow(index.zRange(z_min, z_max))
+    if region is not None:
+        region = tuple(int(v) for v in region)
+        candidates = narrow(index.region(region))
+    if label is not None:
+        if not hasattr(label, 'search'):
+            label = re.compile(label)
+        m = _prefix.match(label.pattern)
+        # ^ can match after any newline with re.MULTILINE, not only at the start of the label
+        if m and '|' not in label.pattern and not label.flags & (re.IGNORECASE | re.MULTILINE):
+            candidates = narrow(index.prefix(m.group(1)))
+    if candidates is None:
+        candidates = index.records.keys()
+
+    results = []
+    for name in candidates:
+        r = index.records[name]
+        if r.cls not in classes:
+            continue
+        if group is not None and r.group != group:
+            continue
+        if bookmark is False and r.bookmark:
+            continue
+        if region is not None:
+            x1, y1, x2, y2 = r.bounds()
+            if contained:
+                if x1 < region[0] or y1 < region[1] or x2 > region[2] or y2 > region[3]:
+                    continue
+            elif x2 < region[0] or y2 < region[1] or x1 > region[2] or y1 > region[3]:
+                continue
+        if label is not None and not label.search(index.plain[name]):
+            continue
+        results.append(r)
+
+    results.sort(key=lambda r: r.name)
+    return results
+
+def query_nodes(**kwargs):
+    """ Same as query(), returning the live nodes. """
+    return [n for n in (r.node() for r in query(**kwargs)) if n is not None]
+
+def select(records, clear=True):
+    """ Selects the nodes of the given records, clearing the current selection first. """
+    if clear:
+        for n in nuke.selectedNodes():
+            n.setSelected(False)
+    for r in records:
+        n = r.node()
+        if n is not None:
+            n.setSelected(True)
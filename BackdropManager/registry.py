@@ -0,0 +1,247 @@
+""" Per-script registry of backdrops and sticky notes.
+
+Bulk operations iterate the registry instead of scanning the whole graph. It is built lazily on first
+use after a script is loaded, and kept up to date from onCreate, onDestroy and knobChanged callbacks.
+Renaming a Group rebuilds it, deleting one drops the records inside.
+
+Nuke doesn't reliably call knobChanged for values set from Python, so the callbacks only cover
+interactive edits, creation and deletion. Code writing watched knobs from Python refreshes what it
+touched once its batch is done: refresh_nodes(nodes) for the nodes it wrote, or refresh(group)
+when it rewrote a whole group.
+"""
+import nuke
+
+CLASSES = ('BackdropNode', 'StickyNote')
+
+# Groups whose renames are watched, deleting any group (gizmos too) drops its records
+GROUP_CLASSES = ('Group', 'LiveGroup')
+
+# Knobs mirrored in the records
+WATCHED_KNOBS = ('xpos', 'ypos', 'bdwidth', 'bdheight', 'tile_color', 'label', 'z_order', 'note_font', 'bookmark')
+
+def walk_groups(group=None):
+    """ Yields a group and every Group or gizmo nested in it, depth first without recursion. """
+    stack = [group or nuke.root()]
+    while stack:
+        g = stack.pop()
+        yield g
+        stack.extend(n for n in reversed(g.nodes()) if isinstance(n, nuke.Group))
+
+def group_key(group):
+    """ Returns the registry key of a group: '' for the root, else the group's full name. """
+    if group is None or group.Class() == 'Root':
+        return ''
+    return group.fullName()
+
+class BackdropRecord(object):
+    """ Cached knob values of one backdrop or sticky note. """
+    __slots__ = ('name', 'cls', 'group', 'x', 'y', 'w', 'h', 'color', 'label', 'z', 'font', 'bookmark')
+
+    def __init__(self, node):
+        self.name = node.fullName()
+        self.cls = node.Class()
+        self.group = self.name.rpartition('.')[0]
+        self.update(node)
+
+    def update(self, node):
+        """ Re-reads the watched knobs from the node. """
+        knobs = node.knobs()
+        self.x = int(node.xpos())
+        self.y = int(node.ypos())
+        if 'bdwidth' in knobs:
+            self.w = int(knobs['bdwidth'].value())
+            self.h = int(knobs['bdheight'].value())
+        else:
+            self.w = node.screenWidth()
+            self.h = node.screenHeight()
+        self.color = int(knobs['tile_color'].value())
+        self.label = knobs['label'].value()
+        self.z = int(knobs['z_order'].value()) if 'z_order' in knobs else 0
+        self.font = knobs['note_font'].value() if 'note_font' in knobs else ''
+        self.bookmark = bool(knobs['bookmark'].value()) if 'bookmark' in knobs else False
+
+    def bounds(self):
+        """ Returns (x1, y1, x2, y2) in DAG coordinates. """
+        return (self.x, self.y, self.x + self.w, self.y + self.h)
+
+    def node(self):
+        """ Returns the live node, or None if it no longer exists. """
+        return nuke.toNode('root.' + self.name)
+
+class BackdropRegistry(object):
+    def __init__(self):
+        self._records = None
+        self._listeners = []
+
+    def addListener(self, listener):
+        """ Registers an object with add(record), remove(record) and clear() methods,
+        called as records change so it can maintain its own indexes. """
+        self._listeners.append(listener)
+        if self._records is not None:
+            for r in self._records.values():
+                listener.add(r)
+
+    def removeListener(self, listener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def invalidate(self):
+        """ Drops the registry, it is rebuilt on next use. """
+        self._records = None
+        for l in self._listeners:
+            l.clear()
+
+    def _build(self):
+        self._records = {}
+        for g in walk_groups():
+            for n in g.nodes():
+                if n.Class() in CLASSES:
+                    self._add(BackdropRecord(n))
+
+    def _add(self, r):
+        self._drop(r.name)
+        self._records[r.name] = r
+        for l in self._listeners:
+            l.add(r)
+
+    def _drop(self, name):
+        r = self._records.pop(name, None)
+        if r is not None:
+            for l in self._listeners:
+                l.remove(r)
+
+    def _update(self, r, node):
+        for l in self._listeners:
+            l.remove(r)
+        r.update(node)
+        for l in self._listeners:
+            l.add(r)
+
+    def ensure(self):
+        """ Builds the registry if it isn't already. """
+        self._all()
+
+    def _all(self):
+        if self._records is None:
+            self._build()
+        return self._records
+
+    def records(self, group=None, classes=CLASSES):
+        """ Returns the records in a group ('' for the root, None for every group). """
+        return [r for r in self._all().values()
+                if r.cls in classes and (group is None or r.group == group)]
+
+    def groups(self, under=''):
+        """ Returns the keys of the groups holding records, in and below the given group, parents first. """
+        prefix = under + '.'
+        keys = set(r.group for r in self._all().values())
+        return sorted(k for k in keys if k == under or not under or k.startswith(prefix))
+
+    def record(self, name):
+        """ Returns the record of a node by full name, or None. """
+        return self._all().get(name)
+
+    def nodes(self, group=None, classes=CLASSES, selected=False):
+        """ Returns the live nodes of the registered records, optionally only the selected ones.
+        Records whose node disappeared without a callback are dropped. """
+        nodes = []
+        for r in self.records(group, classes):
+            n = r.node()
+            if n is None:
+                self._drop(r.name)
+                continue
+            if selected and not n.isSelected():
+                continue
+            nodes.append(n)
+        return nodes
+
+    def refresh(self, group=None):
+        """ Re-reads the knobs of every record in a group. """
+        for r in self.records(group):
+            n = r.node()
+            if n is None:
+                self._drop(r.name)
+            else:
+                self._update(r, n)
+
+    def refresh_nodes(self, nodes):
+        """ Re-reads the knobs of the given nodes, adding the ones missing. Nothing to do before the
+        registry is built. """
+        if self._records is None:
+            return
+        for n in nodes:
+            if n.Class() not in CLASSES:
+                continue
+            r = self._records.get(n.fullName())
+            if r is None:
+                self._add(BackdropRecord(n))
+            else:
+                self._update(r, n)
+
+    # Callbacks
+    def onCreate(self):
+        if self._records is None:
+            return
+        self._add(BackdropRecord(nuke.thisNode()))
+
+    def onDestroy(self):
+        if self._records is None:
+            return
+        self._drop(nuke.thisNode().fullName())
+
+    def onGroupDestroy(self):
+        """ Drops the records inside a deleted group. Called for every deleted node. """
+        if self._records is None:
+            return
+        n = nuke.thisNode()
+        if not isinstance(n, nuke.Group):
+            return
+        prefix = n.fullName() + '.'
+        for name in [k for k in self._records if k.startswith(prefix)]:
+            self._drop(name)
+
+    def groupKnobChanged(self):
+        """ A renamed group changes the name of every record inside it, rebuild lazily. """
+        if self._records is None:
+            return
+        k = nuke.thisKnob()
+        if k is not None and k.name() == 'name':
+            self.invalidate()
+
+    def knobChanged(self):
+        if self._records is None:
+            return
+        k = nuke.thisKnob()
+        if k is None:
+            return
+        name = k.name()
+        if name == 'name':
+            # The old name is gone, rebuild lazily
+            self.invalidate()
+        elif name in WATCHED_KNOBS:
+            n = nuke.thisNode()
+            r = self._records.get(n.fullName())
+            if r is None:
+                self._add(BackdropRecord(n))
+            else:
+                self._update(r, n)
+
+registry = BackdropRegistry()
+
+_installed = False
+
+def install():
+    """ Registers the callbacks keeping the registry up to date. Safe to call more than once. """
+    global _installed
+    if _installed:
+        return
+    _installed = True
+    for cls in CLASSES:
+        nuke.addOnCreate(registry.onCreate, nodeClass=cls)
+        nuke.addOnDestroy(registry.onDestroy, nodeClass=cls)
+        nuke.addKnobChanged(registry.knobChanged, nodeClass=cls)
+    for cls in GROUP_CLASSES:
+        nuke.addKnobChanged(registry.groupKnobChanged, nodeClass=cls)
+    nuke.addOnDestroy(registry.onGroupDestroy)
+    nuke.addOnScriptLoad(registry.invalidate)
+    nuke.addOnScriptClose(registry.invalidate)
@@ -0,0 +1,86 @@
+""" Fuzzy search over backdrop labels.
+
+The label index is a registry listener, so it is built once and updated as backdrops change. Each
+keystroke narrows the previous matches when the query only grew, and candidates are rejected with a
+compiled subsequence pattern before being scored.
+"""
+import re
+
+from BackdropManager.registry import registry
+from BackdropManager.query import plain_label
+
+def fuzzy_score(query, text):
+    """ Scores text against a lowercase query whose characters must appear in order, or returns None.
+    Higher is better: matches at word starts, consecutive runs and an early first match rank first. """
+    score = 0
+    pos = 0
+    prev = -2
+    first = None
+    for ch in query:
+        i = text.find(ch, pos)
+        if i < 0:
+            return None
+        if first is None:
+            first = i
+        if i == prev + 1:
+            score += 5
+        if i == 0 or not text[i - 1].isalnum():
+            score += 8
+        prev = i
+        pos = i + 1
+    if text.startswith(query):
+        score += 20
+    return score - first - len(text) * 0.01
+
+class FuzzyIndex(object):
+    def __init__(self):
+        self.clear()
+
+    # Registry listener
+    def clear(self):
+        self.labels = {}
+        self.text = {}
+        self._last = None
+
+    def add(self, r):
+        if r.cls == 'BackdropNode':
+            text = self.text[r.name] = plain_label(r.label)
+            self.labels[r.name] = text.lower()
+            self._last = None
+
+    def remove(self, r):
+        if self.labels.pop(r.name, None) is not None:
+            self.text.pop(r.name, None)
+            self._last = None
+
+    def search(self, query, limit=50):
+        """ Returns up to limit (full name, plain label) pairs ranked by fuzzy score. """
+        registry.ensure()
+        query = query.strip().lower()
+        if not query:
+            self._last = None
+            return []
+
+        # Typing more only narrows the previous matches
+        if self._last is not None and query.startswith(self._last[0]):
+            candidates = self._last[1]
+        else:
+            candidates = self.labels.keys()
+
+        pattern = re.compile('.*?'.join(re.escape(c) for c in query), re.DOTALL)
+        labels = self.labels
+        matched = [name for name in candidates if pattern.search(labels[name]) or pattern.search(name.lower())]
+        self._last = (query, matched)
+
+        scored = []
+        for name in matched:
+            s = fuzzy_score(query, labels[name])
+            if s is None:
+                # Matched on the node name instead
+                s = fuzzy_score(query, name.lower()) - 10
+            scored.append((-s, name))
+        scored.sort()
+        return [(name, self.text[name]) for s, name in scored[:limit]]
+
+index = FuzzyIndex()
+registry.addListener(index)
@@ -0,0 +1,139 @@
+""" Creates many backdrops at once from a declarative spec.
+
+A spec is a list of backdrop entries, or a dict with an optional "defaults" entry and a "backdrops"
+list, as JSON or (when PyYAML is installed) YAML:
+
+    {"defaults": {"style": "Fill", "padding": 40},
+     "backdrops": [
+        {"label": "Plates", "color": "Plates", "bounds": [0, 0, 800, 400]},
+        {"label": "Grade", "color": "#503020", "nodes": ["Grade1", "Grade2"], "z_order": 1}]}
+
+Each entry takes a label and either bounds (x1, y1, x2, y2) or the names of member nodes, fitted with
+the padding like snapping. color is a preset label, a preset index, a '#rrggbb' hex or normalized rgb.
+align, bold, italic, font, font_size, style, width, z_order, bookmark and padding fall back to the
+defaults, then to the settings. Everything is resolved before any node is made, then all backdrops
+are created in one undo step with their knobs set in the constructor.
+"""
+import os
+import json
+
+import nuke
+
+from BackdropManager import geometry
+from BackdropManager.core import (rgb2interface, hex2interface, make_label, backdrop_knobs, add_backdrop_knobs,
+                                  node_bounds)
+
+# Entry keys and the settings they default to
+SETTINGS_KEYS = {
+    'align': 'align',
+    'bold': 'bold',
+    'italic': 'italic',
+    'font': 'font',
+    'font_size': 'font_size',
+    'style': 'style',
+    'width': 'width',
+    'z_order': 'zorder',
+    'bookmark': 'bookmark',
+    'padding': 'padding',
+    }
+
+def load_spec(path):
+    """ Reads a spec from a .json, .yaml or .yml file, raising ValueError when it can't be parsed. """
+    with open(path) as f:
+        if os.path.splitext(path)[1].lower() in ('.yaml', '.yml'):
+            try:
+                import yaml
+            except ImportError:
+                raise ImportError("Reading %r needs PyYAML, use a JSON spec instead" % path)
+            try:
+                return yaml.safe_load(f)
+            except yaml.YAMLError as e:
+                raise ValueError("%s: %s" % (path, e))
+        return json.load(f)
+
+def resolve_color(value, settings):
+    """ Returns the tile_color of a spec color: a preset label, a preset index, a hex string or rgb. """
+    colors = settings['colors']
+    if isinstance(value, str):
+        if value.startswith('#'):
+            return hex2interface(value)
+        names = [l.strip().lower() for l in settings['labels']]
+        key = value.strip().lower()
+        if key in names:
+            return rgb2interface(colors[names.index(key)])
+        raise ValueError("unknown color preset %r" % value)
+    if isinstance(value, int):
+        return rgb2interface(colors[value])
+    return rgb2interface(value)
+
+def _entries(spec):
+    if spec is None:
+        raise ValueError("The spec is empty")
+    if isinstance(spec, dict):
+        defaults, entries = spec.get('defaults') or {}, spec.get('backdrops') or []
+    else:
+        defaults, entries = {}, spec
+    if not isinstance(defaults, dict):
+        raise ValueError("Defaults must be a dict, not %r" % (defaults,))
+    if not isinstance(entries, list):
+        raise ValueError("Backdrops must be a list, not %r" % (entries,))
+    for i, entry in enumerate(entries):
+        if not isinstance(entry, dict):
+            raise ValueError("Backdrop %d (%r): must be a dict" % (i, entry))
+    return defaults, entries
+
+def resolve(spec, settings):
+    """ Validates a spec and returns the constructor arguments and padding of each backdrop,
+    raising ValueError naming the first bad entry. Member nodes are looked up in the current group. """
+    defaults, entries = _entries(spec)
+    resolved = []
+    for i, entry in enumerate(entries):
+        e = {}
+        for key, setting in SETTINGS_KEYS.items():
+            e[key] = entry.get(key, defaults.get(key, settings[setting]))
+        try:
+            color = entry.get('color', defaults.get('color', 0))
+            color = resolve_color(color, settings)
+
+            if 'bounds' in entry:
+                bounds = tuple(int(v) for v in entry['bounds'])
+                if len(bounds) != 4 or bounds[2] <= bounds[0] or bounds[3] <= bounds[1]:
+                    raise ValueError("bounds must be [x1, y1, x2, y2]")
+            elif entry.get('nodes'):
+                rects = []
+                for name in entry['nodes']:
+                    n = nuke.toNode(name)
+                    if n is None:
+                        raise ValueError("no node named %r" % name)
+                    rects.append(node_bounds(n))
+                bounds = geometry.snap_bounds(rects, e['padding'])
+            else:
+                raise ValueError("needs bounds or nodes")
+        except (ValueError, TypeError, IndexError, KeyError) as err:
+            raise ValueError("Backdrop %d (%r): %s" % (i, entry.get('label', ''), err))
+
+        label = make_label(entry.get('label', ''), e['align'], e['bold'], e['italic'])
+        knobs = backdrop_knobs(bounds, label, color, e['z_order'], e['bookmark'], e['font'],
+                               e['font_size'], e['style'], e['width'])
+        resolved.append((knobs, e['padding']))
+    return resolved
+
+def create_from_spec(spec, settings):
+    """ Creates the backdrops of a spec in the current group, in one undo step. Returns the new nodes. """
+    resolved = resolve(spec, settings)
+    if not resolved:
+        return []
+
+    created = []
+    nuke.Undo.begin('Create Backdrops from Spec')
+    try:
+        for knobs, padding in resolved:
+            n = nuke.nodes.BackdropNode(**knobs)
+            add_backdrop_knobs(n, padding)
+            created.append(n)
+    except Exception:
+        nuke.Undo.cancel()
+        raise
+    else:
+        nuke.Undo.end()
+    return created
@@ -0,0 +1,185 @@
+""" Optional local usage log, and an analyzer for collected logs. Pure Python.
+
+When enabled, each action appends one JSON line: operation, duration in milliseconds, node count,
+Nuke version, group depth and time. Lines are queued and written in batches by a background thread,
+so logging never waits on the disk, and the file is rotated by size. Nothing leaves the machine.
+
+To aggregate logs from many artists:
+
+    python -m BackdropManager.telemetry logs/*.jsonl*
+"""
+import os
+import sys
+import json
+import math
+import time
+import atexit
+import threading
+
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+
+LOG_PATH = os.path.expanduser("~/.nuke/BackdropManager/telemetry.jsonl")
+
+# Rotate at this size, keeping this many old files
+MAX_BYTES = 1024 * 1024
+BACKUPS = 3
+
+# Seconds the writer waits to batch lines
+FLUSH_INTERVAL = 2.0
+
+PERCENTILES = (50, 90, 99)
+
+def rotate(path, backups=BACKUPS):
+    """ Shifts path to path.1, path.1 to path.2 and so on, dropping the oldest. """
+    for i in range(backups, 0, -1):
+        src = path if i == 1 else "%s.%d" % (path, i - 1)
+        if os.path.exists(src):
+            os.rename(src, "%s.%d" % (path, i))
+
+class Writer(threading.Thread):
+    """ Background thread appending queued lines to a size-rotated file. """
+    def __init__(self, path=LOG_PATH, max_bytes=None, backups=None):
+        threading.Thread.__init__(self, name='BackdropManager telemetry')
+        self.daemon = True
+        self.path = path
+        self.max_bytes = max_bytes or MAX_BYTES
+        self.backups = backups or BACKUPS
+        self.lines = queue.Queue()
+        self.stopping = threading.Event()
+
+    def put(self, line):
+        self.lines.put(line)
+
+    def stop(self, timeout=1.0):
+        """ Writes what is queued and ends the thread. """
+        self.stopping.set()
+        self.lines.put(None)
+        self.join(timeout)
+
+    def run(self):
+        running = True
+        while running:
+            batch = [self.lines.get()]
+            if batch[0] is not None:
+                # Gather what follows, unless stopping
+                self.stopping.wait(FLUSH_INTERVAL)
+            while True:
+                try:
+                    batch.append(self.lines.get_nowait())
+                except queue.Empty:
+                    break
+            if None in batch:
+                running = False
+                batch = [l for l in batch if l is not None]
+            if batch:
+                try:
+                    self.write(''.join(batch))
+                except (IOError, OSError):
+                    # Never let logging break anything
+                    pass
+
+    def write(self, data):
+        folder = os.path.dirname(self.path)
+        if folder and not os.path.isdir(folder):
+            os.makedirs(folder)
+        if os.path.exists(self.path) and os.path.getsize(self.path) + len(data) > self.max_bytes:
+            rotate(self.path, self.backups)
+        with open(self.path, 'a') as f:
+            f.write(data)
+
+_writer = None
+
+def enable(path=LOG_PATH):
+    """ Starts logging to path. """
+    global _writer
+    if _writer is not None and _writer.path == path:
+        return
+    disable()
+    _writer = Writer(path)
+    _writer.start()
+
+def disable():
+    """ Stops logging, writing what is still queued. """
+    global _writer
+    if _writer is not None:
+        _writer.stop()
+        _writer = None
+
+def is_enabled():
+    return _writer is not None
+
+atexit.register(disable)
+
+def record(operation, duration, nodes=0, depth=0, version=None):
+    """ Logs one action, duration in seconds. Does nothing unless enabled. """
+    if _writer is None:
+        return
+    _writer.put(json.dumps({
+        'op': operation,
+        'ms': round(duration * 1000.0, 2),
+        'nodes': nodes,
+        'ver': version,
+        'depth': depth,
+        't': int(time.time()),
+        }, separators=(',', ':')) + '\n')
+
+# Analyzer
+def read_logs(paths):
+    """ Yields the records of the given log files, skipping broken lines. """
+    for path in paths:
+        with open(path) as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                # Truncated or foreign lines can still parse, as a number or a string
+                if isinstance(record, dict):
+                    yield record
+
+def percentile(values, p):
+    """ Nearest-rank percentile of sorted values. """
+    k = max(0, min(len(values) - 1, int(math.ceil(p / 100.0 * len(values))) - 1))
+    return values[k]
+
+def aggregate(records):
+    """ Returns {operation: stats} with count, duration percentiles and max, and mean node count. """
+    times = {}
+    nodes = {}
+    for r in records:
+        op = r.get('op')
+        if op is None or 'ms' not in r:
+            continue
+        times.setdefault(op, []).append(r['ms'])
+        nodes[op] = nodes.get(op, 0) + (r.get('nodes') or 0)
+    stats = {}
+    for op, values in times.items():
+        values.sort()
+        s = {'count': len(values), 'max': values[-1], 'nodes': nodes[op] / float(len(values))}
+        for p in PERCENTILES:
+            s['p%d' % p] = percentile(values, p)
+        stats[op] = s
+    return stats
+
+def report(stats):
+    """ Returns the aggregated stats as a table, slowest p90 first. """
+    cols = ['p%d' % p for p in PERCENTILES] + ['max']
+    lines = ['%-28s %7s %s %9s' % ('operation', 'count', ' '.join('%9s' % c for c in cols), 'nodes')]
+    for op in sorted(stats, key=lambda op: -stats[op]['p90']):
+        s = stats[op]
+        lines.append('%-28s %7d %s %9.0f' % (op, s['count'], ' '.join('%9.1f' % s[c] for c in cols), s['nodes']))
+    return '\n'.join(lines)
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        sys.stderr.write("usage: python -m BackdropManager.telemetry LOG [LOG ...]\n")
+        return 2
+    sys.stdout.write(report(aggregate(read_logs(argv))) + '\n')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,88 @@
+""" Construction and first paint times of the BackdropManager dialogs and panel, offscreen.
+
+    python benchmarks/bench_dialogs.py [--repeat 10] [--json results.json]
+
+For 8, 100 and 500 color presets, builds BackdropManagerSettings, BackdropManagerUI and BackdropPanel
+and times the constructor and the time from show() to the first paint event. Then times reopening
+after a close through gui(), guiUI() and guiEdit(), the way the menu commands and shortcuts do.
+Times are medians in milliseconds; the first, cold build is reported separately.
+"""
+import time
+import argparse
+
+import common
+from common import bm, nuke
+
+PRESETS = (8, 100, 500)
+
+def construct(cls, repeat):
+    """ Returns (cold, construct, paint) times for building and showing a widget. """
+    built = []
+    painted = []
+    for i in range(repeat + 1):
+        t0 = time.perf_counter()
+        w = cls()
+        t1 = time.perf_counter()
+        watch = common.PaintWatch(w)
+        w.show()
+        watch.wait()
+        t2 = time.perf_counter()
+        built.append((t1 - t0) * 1000.0)
+        painted.append((t2 - t1) * 1000.0)
+        common.close(w)
+        w.deleteLater()
+        common.drain()
+    return built[0], common.median(built[1:]), common.median(painted[1:])
+
+def reopen(command, dialog, repeat):
+    """ Returns the median time from calling command to the first paint of the dialog it shows,
+    after closing it. dialog() returns the current dialog. """
+    command()
+    common.PaintWatch(dialog()).wait()
+    times = []
+    for i in range(repeat):
+        common.close(dialog())
+        t0 = time.perf_counter()
+        command()
+        common.PaintWatch(dialog()).wait()
+        times.append((time.perf_counter() - t0) * 1000.0)
+    common.close(dialog())
+    return common.median(times)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--json', help="also write the results to this file")
+    args = parser.parse_args()
+
+    common.make_dag()
+    common.populate()
+    widgets = (
+        ('BackdropManagerSettings', bm.BackdropManagerSettings),
+        ('BackdropManagerUI', bm.BackdropManagerUI),
+        ('BackdropPanel', bm.BackdropPanel),
+        )
+    commands = (
+        ('gui()', bm.gui, lambda: bm._sew_instance),
+        ('guiUI()', bm.guiUI, bm._ui_instance),
+        ('guiEdit()', bm.guiEdit, bm._ui_instance),
+        )
+
+    rows = []
+    for presets in PRESETS:
+        common.write_settings(presets)
+        for name, cls in widgets:
+            cold, built, paint = construct(cls, args.repeat)
+            rows.append({'widget': name, 'presets': presets, 'cold': cold, 'construct': built, 'first paint': paint,
+                         'reopen': ''})
+        for name, command, dialog in commands:
+            rows.append({'widget': name, 'presets': presets, 'cold': '', 'construct': '', 'first paint': '',
+                         'reopen': reopen(command, dialog, args.repeat)})
+
+    print("Median ms over %d runs, %d backdrops in the script" % (args.repeat, len(nuke.allNodes('BackdropNode'))))
+    common.report(rows, ['widget', 'presets', 'cold', 'construct', 'first paint', 'reopen'])
+    if args.json:
+        common.dump(rows, args.json)
+
+if __name__ == '__main__':
+    main()
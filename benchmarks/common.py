@@ -0,0 +1,115 @@
+""" Shared setup for the offscreen benchmarks: a stand-in nuke module, a throwaway settings folder
+and helpers to wait for paints. Import this before anything from BackdropManager. """
+import os
+import sys
+import json
+import time
+import tempfile
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+# Settings are read from ~/.nuke, keep the real ones out of it
+os.environ['HOME'] = tempfile.mkdtemp(prefix='backdropmanager-bench-')
+sys.path[:0] = [os.path.join(HERE, 'stand_in'), os.path.dirname(HERE)]
+
+import nuke
+from BackdropManager import backdrop_manager as bm, core
+from BackdropManager.backdrop_manager import QtCore, QtWidgets
+
+app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv[:1])
+
+def _quiet(mode, context, message):
+    # The offscreen platform warns about every raise() and resize hint
+    if 'This plugin does not support' not in message:
+        sys.stderr.write(message + '\n')
+
+QtCore.qInstallMessageHandler(_quiet)
+
+# PySide6 6.12.0 drops a reference to True on every emit of an argument-less signal (a thousand emits
+# of a bare Signal() reproduce it), which aborts Python before 3.12 in bool_dealloc partway through
+# a run. 6.11.2 is not affected, and True can't be freed from 3.12 on.
+_pyside6 = sys.modules.get('PySide6')
+if _pyside6 is not None and tuple(_pyside6.__version_info__[:3]) == (6, 12, 0) and sys.version_info < (3, 12):
+    sys.exit("PySide6 6.12.0 aborts Python %d.%d on signal emits, run the benchmarks with PySide6 6.11 "
+             "or Python 3.12+" % sys.version_info[:2])
+
+def write_settings(presets):
+    """ Saves default settings with the given number of color presets. """
+    settings = bm.Overrides()
+    d = settings.restore()
+    base = list(d['colors'][:8])
+    d['colors'] = [base[i % len(base)] for i in range(presets)]
+    d['labels'] = ["Preset %d" % i for i in range(presets)]
+    core._save_yaml(obj={'settings': d, 'version': 3}, path=settings.settings_path)
+
+def populate(backdrops=50, nodes=500, selected=10):
+    """ Fills the stand-in script with nodes and backdrops, the first few backdrops selected. """
+    nuke.reset()
+    for i in range(nodes):
+        nuke.make_node('Grade', 'Grade%d' % i, xpos=(i % 40) * 120, ypos=(i // 40) * 80)
+    for i in range(backdrops):
+        nuke.make_node('BackdropNode', 'BackdropNode%d' % i, xpos=(i % 10) * 600, ypos=(i // 10) * 500,
+                       label='<center>Backdrop %d' % i, selected=i < selected)
+    bm.registry.invalidate()
+
+_dag = None
+
+def make_dag():
+    """ Shows an empty widget that wrapped() takes for the root Node Graph. """
+    global _dag
+    if _dag is None:
+        _dag = QtWidgets.QWidget()
+        _dag.setObjectName(bm.DAG_OBJECT_NAME)
+        _dag.setWindowTitle(bm.DAG_TITLE)
+        _dag.show()
+    return _dag
+
+class PaintWatch(QtCore.QObject):
+    """ Notes when a widget is first painted. """
+    def __init__(self, widget):
+        QtCore.QObject.__init__(self)
+        self.painted = False
+        self.widget = widget
+        widget.installEventFilter(self)
+
+    def eventFilter(self, obj, evt):
+        if evt.type() == QtCore.QEvent.Paint:
+            self.painted = True
+        return False
+
+    def wait(self, timeout=5.0):
+        """ Runs the event loop until the widget has painted. """
+        end = time.perf_counter() + timeout
+        while not self.painted and time.perf_counter() < end:
+            app.processEvents()
+        self.widget.removeEventFilter(self)
+        return self.painted
+
+def drain():
+    """ Runs pending events and deferred deletes. """
+    app.processEvents()
+    QtCore.QCoreApplication.sendPostedEvents(None, QtCore.QEvent.DeferredDelete)
+    app.processEvents()
+
+def close(widget):
+    widget.close()
+    drain()
+
+def median(values):
+    values = sorted(values)
+    return values[len(values) // 2]
+
+def report(rows, columns):
+    """ Prints rows of dicts as a table. """
+    widths = [max(len(c), max(len(fmt(r[c])) for r in rows)) for c in columns]
+    print('  '.join(c.ljust(w) for c, w in zip(columns, widths)))
+    for r in rows:
+        print('  '.join(fmt(r[c]).ljust(w) for c, w in zip(columns, widths)))
+
+def fmt(v):
+    return '%.2f' % v if isinstance(v, float) else str(v)
+
+def dump(rows, path):
+    with open(path, 'w') as f:
+        json.dump(rows, f, indent=1)
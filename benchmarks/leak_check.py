@@ -0,0 +1,178 @@
+""" Leak regression check: opens and closes every dialog, and reloads the panel, many times.
+
+    python benchmarks/leak_check.py [--cycles 1000] [--only NAME]
+
+Each scenario runs a warm-up, then its cycles under tracemalloc. Live QObjects (everything parented
+to the application's top level widgets), Python objects tracked by the garbage collector and traced
+memory are compared before and after. Exits with 1 if any of them grew past its allowance, listing
+the allocation sites that grew most.
+"""
+import gc
+import sys
+import argparse
+import tracemalloc
+import collections
+
+import common
+from common import bm, nuke, QtCore
+
+WARMUP = 20
+
+# Allowed growth over the whole run, plus per cycle
+QOBJECT_SLACK = 10
+PYOBJECT_SLACK = 500
+PYOBJECT_PER_CYCLE = 0.05
+MEMORY_SLACK = 256 * 1024
+MEMORY_PER_CYCLE = 64
+
+# Gesture objects Qt's gesture manager caches and frees on its own schedule
+IGNORED = ('QPanGesture', 'QPinchGesture', 'QSwipeGesture', 'QTapGesture', 'QTapAndHoldGesture')
+
+def qobjects():
+    """ Counts the QObjects reachable from the application and its top level widgets, by class. """
+    app = common.app
+    objects = [app] + app.findChildren(QtCore.QObject)
+    for w in app.topLevelWidgets():
+        objects.append(w)
+        objects.extend(w.findChildren(QtCore.QObject))
+    counts = collections.Counter(o.metaObject().className() for o in objects)
+    for name in IGNORED:
+        counts.pop(name, None)
+    return counts
+
+def settle():
+    common.drain()
+    gc.collect()
+    common.drain()
+
+def measure():
+    """ Returns (QObject counts, Python object count, traced memory, snapshot). """
+    settle()
+    # Python side first, counting QObjects creates wrappers for them
+    pyobjects = len(gc.get_objects())
+    memory = tracemalloc.get_traced_memory()[0]
+    snapshot = tracemalloc.take_snapshot()
+    return qobjects(), pyobjects, memory, snapshot
+
+# Scenarios: each returns (setup, cycle, teardown)
+def open_close(command, dialog):
+    def cycle():
+        command()
+        common.app.processEvents()
+        common.close(dialog())
+    return None, cycle, None
+
+def panel_build():
+    def cycle():
+        p = bm.BackdropPanel()
+        p.show()
+        common.app.processEvents()
+        p.close()
+        p.deleteLater()
+        common.drain()
+    return None, cycle, None
+
+def panel_reload():
+    state = {}
+    def setup():
+        state['panel'] = bm.BackdropPanel()
+        state['panel'].show()
+    def cycle():
+        state['panel'].clear()
+        common.drain()
+    def teardown():
+        state.pop('panel').deleteLater()
+    return setup, cycle, teardown
+
+def settings_add_remove():
+    state = {}
+    def setup():
+        state['getColor'] = nuke.getColor
+        nuke.getColor = lambda *args: 0x336699ff
+        state['dialog'] = bm.BackdropManagerSettings()
+        state['dialog'].show()
+    def cycle():
+        state['dialog'].add()
+        state['dialog'].min()
+        # Deferred deletes, as Nuke's event loop would run them
+        common.drain()
+    def teardown():
+        nuke.getColor = state.pop('getColor')
+        state.pop('dialog').deleteLater()
+    return setup, cycle, teardown
+
+SCENARIOS = (
+    ('gui()', lambda: open_close(bm.gui, lambda: bm._sew_instance)),
+    ('guiUI()', lambda: open_close(bm.guiUI, bm._ui_instance)),
+    ('guiEdit()', lambda: open_close(bm.guiEdit, bm._ui_instance)),
+    ('BackdropPanel', panel_build),
+    ('BackdropPanel.clear()', panel_reload),
+    ('settings add()/min()', settings_add_remove),
+    )
+
+def run(name, scenario, cycles):
+    setup, cycle, teardown = scenario()
+    if setup:
+        setup()
+    for i in range(WARMUP):
+        cycle()
+    # Wraps the QObjects alive now, so the first census doesn't count as growth
+    qobjects()
+    tracemalloc.start(10)
+    q0, p0, m0, before = measure()
+    for i in range(cycles):
+        cycle()
+    q1, p1, m1, after = measure()
+    tracemalloc.stop()
+    if teardown:
+        teardown()
+    settle()
+
+    grown = q1 - q0
+    q0 = sum(q0.values())
+    q1 = sum(q1.values())
+    failures = []
+    if q1 - q0 > QOBJECT_SLACK:
+        failures.append("QObjects %d -> %d, most new: %s" % (q0, q1, ', '.join(
+            "%s +%d" % item for item in grown.most_common(5))))
+    if p1 - p0 > PYOBJECT_SLACK + PYOBJECT_PER_CYCLE * cycles:
+        failures.append("Python objects %d -> %d" % (p0, p1))
+    if m1 - m0 > MEMORY_SLACK + MEMORY_PER_CYCLE * cycles:
+        failures.append("traced memory %d -> %d bytes" % (m0, m1))
+
+    print("%-24s QObjects %+6d  Python objects %+7d  memory %+9d bytes  %s"
+          % (name, q1 - q0, p1 - p0, m1 - m0, 'LEAK' if failures else 'ok'))
+    if failures:
+        for f in failures:
+            print("    " + f)
+        for stat in after.compare_to(before, 'traceback')[:5]:
+            print("    %+d bytes in %d blocks, from" % (stat.size_diff, stat.count_diff))
+            for line in stat.traceback.format()[-4:]:
+                print("      " + line)
+    return not failures
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--cycles', type=int, default=1000)
+    parser.add_argument('--only', help="run only the scenarios whose name contains this")
+    args = parser.parse_args()
+
+    common.make_dag()
+    common.populate()
+    common.write_settings(8)
+
+    ok = True
+    for name, scenario in SCENARIOS:
+        if args.only and args.only not in name:
+            continue
+        ok = run(name, scenario, args.cycles) and ok
+
+    # Tear the widgets down before the interpreter does
+    for w in common.app.topLevelWidgets():
+        w.close()
+        w.deleteLater()
+    settle()
+    return 0 if ok else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
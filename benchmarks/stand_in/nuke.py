@@ -0,0 +1,210 @@
+""" Stand-in for the parts of the nuke module BackdropManager uses, so its Qt code can be
+benchmarked outside Nuke. Only meant for the scripts in benchmarks/. """
+
+NUKE_VERSION_MAJOR = 13
+GUI = False
+INPUTS = 1
+HIDDEN_INPUTS = 2
+
+class Knob(object):
+    def __init__(self, name, value=0):
+        self._name = name
+        self._value = value
+
+    def name(self):
+        return self._name
+
+    def value(self):
+        return self._value
+
+    def getValue(self):
+        return self._value
+
+    def setValue(self, value):
+        self._value = value
+
+    def setName(self, name):
+        self._name = name
+
+    def setLabel(self, label):
+        pass
+
+class Int_Knob(Knob):
+    def __init__(self, name, label=None):
+        Knob.__init__(self, name, 0)
+
+class PyScript_Knob(Knob):
+    def __init__(self, name, label=None):
+        Knob.__init__(self, name, '')
+
+BACKDROP_KNOBS = {
+    'label': '', 'tile_color': 0, 'note_font': 'Verdana', 'note_font_size': 20, 'bookmark': False,
+    'z_order': 0, 'appearance': 'Fill', 'border_width': 0, 'bdwidth': 200, 'bdheight': 150,
+    }
+
+class Node(object):
+    def __init__(self, cls, name, group=None, **values):
+        self._cls = cls
+        self._name = name
+        self._group = group
+        self._selected = values.pop('selected', False)
+        defaults = dict(BACKDROP_KNOBS) if cls == 'BackdropNode' else {'label': '', 'tile_color': 0}
+        defaults.update(xpos=0, ypos=0)
+        defaults.update(values)
+        self._knobs = dict((k, Knob(k, v)) for k, v in defaults.items())
+
+    def Class(self):
+        return self._cls
+
+    def name(self):
+        return self._name
+
+    def fullName(self):
+        if self._group is None or self._group is _root:
+            return self._name
+        return self._group.fullName() + '.' + self._name
+
+    def knobs(self):
+        return self._knobs
+
+    def knob(self, name):
+        return self._knobs.get(name)
+
+    def __getitem__(self, name):
+        return self._knobs[name]
+
+    def addKnob(self, knob):
+        self._knobs[knob.name()] = knob
+
+    def xpos(self):
+        return self._knobs['xpos'].value()
+
+    def ypos(self):
+        return self._knobs['ypos'].value()
+
+    def setXYpos(self, x, y):
+        self._knobs['xpos'].setValue(x)
+        self._knobs['ypos'].setValue(y)
+
+    def screenWidth(self):
+        return 80
+
+    def screenHeight(self):
+        return 18
+
+    def isSelected(self):
+        return self._selected
+
+    def setSelected(self, selected):
+        self._selected = selected
+
+    def selectNodes(self, selected=True):
+        pass
+
+    def dependencies(self, what=None):
+        return []
+
+class Group(Node):
+    def __init__(self, cls='Group', name='', group=None, **values):
+        Node.__init__(self, cls, name, group, **values)
+        self._nodes = []
+
+    def nodes(self):
+        return list(self._nodes)
+
+    def __enter__(self):
+        _context.append(self)
+        return self
+
+    def __exit__(self, *args):
+        _context.pop()
+
+_root = Group('Root', 'root')
+_context = [_root]
+_preferences = Node('Preferences', 'preferences', UIBackColor=0x323232ff, GridWidth=110, GridHeight=24)
+
+def reset():
+    """ Empties the script. """
+    del _root._nodes[:]
+
+def make_node(cls, name, **values):
+    """ Adds a node to the current group and returns it. """
+    n = Node(cls, name, thisGroup(), **values)
+    thisGroup()._nodes.append(n)
+    return n
+
+def root():
+    return _root
+
+def thisGroup():
+    return _context[-1]
+
+def thisNode():
+    return None
+
+def thisKnob():
+    return None
+
+def allNodes(filter=None, group=None, recurseGroups=False):
+    return [n for n in (group or thisGroup()).nodes() if filter is None or n.Class() == filter]
+
+def selectedNodes():
+    return [n for n in thisGroup().nodes() if n.isSelected()]
+
+def toNode(name):
+    if name == 'preferences':
+        return _preferences
+    if name.startswith('root.'):
+        name = name[5:]
+        group = _root
+    else:
+        group = thisGroup()
+    for n in group.nodes():
+        if n.name() == name:
+            return n
+    return None
+
+class _Nodes(object):
+    def __getattr__(self, cls):
+        return lambda **values: make_node(cls, '%s%d' % (cls, len(thisGroup().nodes()) + 1), **values)
+
+nodes = _Nodes()
+
+def createNode(cls, args='', inpanel=True):
+    return getattr(nodes, cls)()
+
+class Undo(object):
+    @staticmethod
+    def begin(name=None):
+        pass
+
+    @staticmethod
+    def end():
+        pass
+
+    @staticmethod
+    def cancel():
+        pass
+
+class _Menu(object):
+    def addCommand(self, *args, **kwargs):
+        return self
+
+    def addMenu(self, *args, **kwargs):
+        return self
+
+def menu(name):
+    return _Menu()
+
+def _noop(*args, **kwargs):
+    return None
+
+addOnCreate = addOnDestroy = addKnobChanged = removeKnobChanged = _noop
+addOnScriptLoad = addOnScriptClose = _noop
+zoom = showDag = message = warning = getFilename = _noop
+
+def getColor(initial=0):
+    return initial
+
+def tprint(*args):
+    pass
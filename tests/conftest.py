@@ -0,0 +1,12 @@
+""" Runs the tests outside Nuke, against the stand-in nuke module of the benchmarks, with a throwaway
+home folder so the real settings and logs in ~/.nuke are never touched. """
+import os
+import sys
+import tempfile
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+os.environ['HOME'] = tempfile.mkdtemp(prefix='backdropmanager-test-')
+sys.path[:0] = [os.path.join(ROOT, 'benchmarks', 'stand_in'), ROOT]
@@ -0,0 +1,29 @@
+from functools import partial
+
+import pytest
+
+bm = pytest.importorskip('BackdropManager.backdrop_manager')
+from BackdropManager import telemetry
+
+def test_wrapped_logs_partials(tmp_path):
+    app = bm.QtWidgets.QApplication.instance() or bm.QtWidgets.QApplication([])
+    # wrapped() only runs with a node graph to run in
+    dag = bm.QtWidgets.QWidget()
+    dag.setObjectName(bm.DAG_OBJECT_NAME)
+    dag.setWindowTitle(bm.DAG_TITLE)
+    dag.show()
+
+    calls = []
+    def resolve(mode):
+        calls.append(mode)
+        return mode
+
+    path = str(tmp_path / 'telemetry.jsonl')
+    telemetry.enable(path)
+    try:
+        assert bm.wrapped(partial(resolve, 'grow'))() == 'grow'
+    finally:
+        telemetry.disable()
+        dag.close()
+    assert calls == ['grow']
+    assert [r['op'] for r in telemetry.read_logs([path])] == ['resolve']
@@ -0,0 +1,25 @@
+from BackdropManager import lint, nk
+
+SCRIPT = """
+BackdropNode {
+ name Plain
+ note_font Verdana
+ label Plates
+}
+BackdropNode {
+ name Bold
+ note_font "Verdana Bold"
+ label Comp
+}
+BackdropNode {
+ name Other
+ note_font "Arial Bold"
+ label Grade
+}
+"""
+
+def test_font_style_suffix():
+    config = dict(lint.DEFAULTS, rules=['font'], font='Verdana')
+    count, issues = lint.lint_nodes(nk.read_nodes(SCRIPT), config)
+    assert count == 3
+    assert [(rule, name) for rule, name, message in issues] == [('font', 'Other')]
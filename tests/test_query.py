@@ -0,0 +1,27 @@
+import re
+import time
+
+import nuke
+
+from BackdropManager.registry import registry
+from BackdropManager.query import query
+
+def setup_function(function):
+    nuke.reset()
+    registry.invalidate()
+
+def test_anchored_multiline_label():
+    nuke.make_node('BackdropNode', 'Notes', label='Notes\nCOMP_main')
+    nuke.make_node('BackdropNode', 'Comp', label='COMP_bg')
+    assert [r.name for r in query(label='^COMP_')] == ['Comp']
+    assert [r.name for r in query(label=re.compile('^COMP_', re.MULTILINE))] == ['Comp', 'Notes']
+
+def test_huge_region():
+    nuke.make_node('BackdropNode', 'A', xpos=0, ypos=0, bdwidth=200, bdheight=100)
+    nuke.make_node('BackdropNode', 'B', xpos=5000, ypos=5000, bdwidth=200, bdheight=100)
+    t0 = time.perf_counter()
+    found = query(region=(-10 ** 7, -10 ** 7, 10 ** 7, 10 ** 7))
+    # Walking every cell of this region would take minutes
+    assert time.perf_counter() - t0 < 1.0
+    assert [r.name for r in found] == ['A', 'B']
+    assert [r.name for r in query(region=(-100, -100, 300, 300))] == ['A']